@@ -2,3 +2,11 @@
 
 
 from .core import *
+from . import core as _core
+
+
+def __getattr__(name):
+    # Modules and functions imported by core on first use
+    if name in _core._LAZY_NAMES:
+        return _core.__getattr__(name)
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
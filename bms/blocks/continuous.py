@@ -5,7 +5,36 @@
 
 from bms import Block
 import numpy as np
-from scipy.special import factorial
+from math import factorial
+
+
+def _Recurrence(coefficients, inputs, past_outputs):
+    """
+    Solution of the recurrence y[n] = w[n] + sum_i c_i y[n-p+i], computed step
+    by step in the order of ODE.StepOutputs, on floats rather than numpy
+    scalars for speed.
+
+    :param coefficients: c_0 to c_p-1, for the oldest output first
+    :param inputs: w, array of shape (n,) or (n, ensemble_size)
+    :param past_outputs: y[-p] to y[-1]
+    :returns: y[0] to y[n-1]
+    """
+    p = len(coefficients)
+    if inputs.ndim == 1:
+        outputs = past_outputs.tolist()+inputs.tolist()
+    else:
+        outputs = list(past_outputs)+list(inputs)
+    if p == 1:
+        c0, = coefficients
+        for n in range(1, len(outputs)):
+            outputs[n] = outputs[n]+c0*outputs[n-1]
+    else:
+        for n in range(p, len(outputs)):
+            value = outputs[n]
+            for i, c in enumerate(coefficients):
+                value = value+c*outputs[n-p+i]
+            outputs[n] = value
+    return np.array(outputs[p:])
 
 
 class Gain(Block):
@@ -21,6 +50,8 @@ class Gain(Block):
 
     """
 
+    __slots__ = ('value', 'offset')
+
     def __init__(self, input_variable, output_variable, value, offset=0):
         Block.__init__(self, [input_variable], [output_variable], 1, 0)
         self.value = value
@@ -29,6 +60,17 @@ class Gain(Block):
     def Evaluate(self, it, ts):
         return self.value*self.InputValues(it)[0]+self.offset
 
+    def StepOutputs(self, it, ts):
+        return (self.value*self._input_rows[0][it]+self.offset,)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        return [self.value*self._input_rows[0][it_start:it_end]+self.offset]
+
+    def LinearCoefficients(self, ts):
+        return [[self.value]], [], self.offset
+
     def LabelBlock(self):
         return str(self.value)
 
@@ -47,12 +89,28 @@ class Sum(Block):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, inputs, output_variable):
         Block.__init__(self, inputs, [output_variable], 1, 0)
 
     def Evaluate(self, it, ts):
         return np.array([np.sum(self.InputValues(it))])
 
+    def StepOutputs(self, it, ts):
+        value = 0.
+        for row in self._input_rows:
+            value += row[it]
+        return (value,)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        return [np.sum([row[it_start:it_end] for row in self._input_rows], axis=0)]
+
+    def LinearCoefficients(self, ts):
+        return [[1.]]*self.n_inputs, [], 0.
+
     def LabelBlock(self):
         return '+'
 
@@ -73,6 +131,8 @@ class WeightedSum(Block):
 
     """
 
+    __slots__ = ('weights', 'offset')
+
     def __init__(self, inputs, output_variable, weights, offset=0):
         Block.__init__(self, inputs, [output_variable], 1, 0)
         self.weights = weights
@@ -83,6 +143,24 @@ class WeightedSum(Block):
         value = np.dot(self.weights, self.InputValues(it))+self.offset
         return value
 
+    def StepOutputs(self, it, ts):
+        # New value: offset may be an array of the members of an ensemble
+        value = self.offset
+        for weight, row in zip(self.weights, self._input_rows):
+            value = value+weight*row[it]
+        return (value,)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        value = self.offset
+        for weight, row in zip(self.weights, self._input_rows):
+            value = value+weight*row[it_start:it_end]
+        return [value]
+
+    def LinearCoefficients(self, ts):
+        return [[weight] for weight in self.weights], [], self.offset
+
     def LabelBlock(self):
         return 'W+'+str(self.weights)
 
@@ -102,6 +180,8 @@ class Subtraction(Block):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, input_variable1, input_variable2, output_variable):
         Block.__init__(self, [input_variable1, input_variable2], [
                        output_variable], 1, 0)
@@ -109,6 +189,19 @@ class Subtraction(Block):
     def Evaluate(self, it, ts):
         return np.dot(np.array([1, -1]), self.InputValues(it))
 
+    def StepOutputs(self, it, ts):
+        row1, row2 = self._input_rows
+        return (row1[it]-row2[it],)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        row1, row2 = self._input_rows
+        return [row1[it_start:it_end]-row2[it_start:it_end]]
+
+    def LinearCoefficients(self, ts):
+        return [[1.], [-1.]], [], 0.
+
     def LabelBlock(self):
         return '-'
 
@@ -128,6 +221,8 @@ class Product(Block):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, input_variable1, input_variable2, output_variable):
 
         Block.__init__(self, [input_variable1, input_variable2], [
@@ -137,6 +232,16 @@ class Product(Block):
         value1, value2 = self.InputValues(it)
         return np.array([value1*value2])
 
+    def StepOutputs(self, it, ts):
+        row1, row2 = self._input_rows
+        return (row1[it]*row2[it],)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        row1, row2 = self._input_rows
+        return [row1[it_start:it_end]*row2[it_start:it_end]]
+
     def LabelBlock(self):
         return 'x'
 
@@ -156,6 +261,8 @@ class Division(Block):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, input_variable1, input_variable2, output_variable):
 
         Block.__init__(self, [input_variable1, input_variable2], [
@@ -166,6 +273,16 @@ class Division(Block):
         value1, value2 = self.InputValues(it)
         return value1 / value2
 
+    def StepOutputs(self, it, ts):
+        row1, row2 = self._input_rows
+        return (row1[it] / row2[it],)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        row1, row2 = self._input_rows
+        return [row1[it_start:it_end] / row2[it_start:it_end]]
+
     def LabelBlock(self):
         return '/'
 
@@ -192,8 +309,13 @@ class ODE(Block):
         a: This is the a vector for the transfer function.
         b: This is the b vector for the transfer function.
 
+    a and b may be changed between simulations, keeping their lengths which
+    set the orders of the block in its model.
+
     """
 
+    __slots__ = ('_a', '_b', '_M')
+
     def __init__(self, input_variable, output_variable, a, b):
         Block.__init__(self, [input_variable], [
                        output_variable], len(a), len(b)-1)
@@ -203,9 +325,33 @@ class ODE(Block):
         self.b = b
         self._M = {}  # Output matrices stored for differents time steps
 
+    def _get_a(self):
+        return self._a
+
+    def _set_a(self, a):
+        # Orders are unset when restoring a saved block
+        if len(a) != getattr(self, 'max_input_order', len(a)):
+            raise ValueError('a must keep its length {}'.format(self.max_input_order))
+        self._a = a
+        self._M = {}
+
+    a = property(_get_a, _set_a)
+
+    def _get_b(self):
+        return self._b
+
+    def _set_b(self, b):
+        if len(b)-1 != getattr(self, 'max_output_order', len(b)-1):
+            raise ValueError('b must keep its length {}'.format(self.max_output_order+1))
+        self._b = b
+        self._M = {}
+
+    b = property(_get_b, _set_b)
+
     def _get_M(self, delta_t):
+        # Lists rather than arrays: coefficients may be arrays in ensembles
         n = len(self.a)
-        A = np.zeros(n)
+        A = [0.]*n
         for i, ai in enumerate(self.a):
             Ae = [self.a[i] * (-1)**j * factorial(i) / factorial(j) / factorial(
                 i-j) / ((delta_t)**i) for j in range(i + 1)]  # Elementary A to assemblate in A
@@ -213,7 +359,7 @@ class ODE(Block):
                 A[j] += aej
 
         n = len(self.b)
-        B = np.zeros(n)
+        B = [0.]*n
         for i, ai in enumerate(self.b):
             Be = [self.b[i] * (-1)**j * factorial(i) / factorial(j) / factorial(
                 i-j) / ((delta_t)**i) for j in range(i + 1)]  # Elementary B to assemblate in B
@@ -244,6 +390,42 @@ class ODE(Block):
 #            print(np.dot(Mo,self.OutputValues(it).T))
         return np.dot(Mi, self.InputValues(it).T) + np.dot(Mo, self.OutputValues(it).T)
 
+    def StepOutputs(self, it, ts):
+        Mi, Mo = self.OutputMatrices(ts)
+        input_row = self._input_rows[0]
+        output_row = self._output_rows[0]
+        value = 0.
+        i0 = it-len(Mi)+1
+        for i, mi in enumerate(Mi):
+            value += mi*input_row[i0+i]
+        i0 = it-len(Mo)
+        for i, mo in enumerate(Mo):
+            value += mo*output_row[i0+i]
+        return (value,)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def LinearCoefficients(self, ts):
+        Mi, Mo = self.OutputMatrices(ts)
+        return [Mi[::-1]], Mo[::-1], 0.
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        # Recurrence of StepOutputs: the contribution of inputs is computed
+        # at once, then the one of past outputs by a scan
+        Mi, Mo = self.OutputMatrices(ts)
+        if any(np.ndim(m) for m in Mi+Mo):
+            # Coefficients varying between members of an ensemble
+            return None
+        input_row = self._input_rows[0]
+        output_row = self._output_rows[0]
+        i0 = it_start-len(Mi)+1
+        inputs = 0.
+        for i, mi in enumerate(Mi):
+            inputs = inputs+mi*input_row[i0+i:it_end-len(Mi)+1+i]
+        if not Mo:
+            return [inputs]
+        return [_Recurrence(Mo, inputs, output_row[it_start-len(Mo):it_start])]
+
     def LabelBlock(self):
         return str(self.a) + '\n' + str(self.b)
 
@@ -261,6 +443,8 @@ class IntegrationBlock(ODE):
         output_variable (Variable): This is the output of the block.
 
     """
+    __slots__ = ()
+
     def __init__(self, input_variable, output_variable):
         ODE.__init__(self, input_variable, output_variable, a=[1], b=[0, 1])
         
@@ -278,6 +462,8 @@ class DifferentiationBlock(ODE):
         output_variable (Variable): This is the output of the block.
     
     """
+    __slots__ = ()
+
     def __init__(self, input_variable, output_variable):
         ODE.__init__(self, input_variable, output_variable, a=[0, 1], b=[1])
         
@@ -294,11 +480,16 @@ class FunctionBlock(Block):
         input_variable: This is the input or list of inputs of the block.
         output_variable (Variable): This is the output of the block.
         function: This is the function that takes the inputs and returns the output.
+        vectorized (bool): True if the function can be called with arrays of
+            values, to evaluate it over all time steps in one call.
 
     """
 
-    def __init__(self, input_variable, output_variable, function):
+    __slots__ = ('list_as_input', 'vectorized', 'function')
+
+    def __init__(self, input_variable, output_variable, function, vectorized=False):
         self.list_as_input = isinstance(input_variable, list)
+        self.vectorized = vectorized
 
         if self.list_as_input:
             Block.__init__(self, input_variable, [output_variable], 1, 0)
@@ -313,6 +504,19 @@ class FunctionBlock(Block):
         else:
             return np.array([self.function(self.InputValues(it)[0])])
 
+    def StepOutputs(self, it, ts):
+        return (self.function(*[row[it] for row in self._input_rows]),)
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        inputs = [row[it_start:it_end] for row in self._input_rows]
+        shape = inputs[0].shape
+        if self.vectorized:
+            return [np.broadcast_to(self.function(*inputs), shape)]
+        if len(shape) > 1:
+            # Ensemble: called once per member and per time step
+            return [np.vectorize(self.function, otypes=[float])(*inputs)]
+        return [np.array([self.function(*values) for values in zip(*inputs)], dtype=float)]
+
     def LabelBlock(self):
         return 'f(t)'
 
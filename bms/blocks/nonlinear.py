@@ -52,6 +52,8 @@ class Delay(Block):
     
     :param delay: a delay in seconds
     """
+    __slots__ = ('delay',)
+
     def __init__(self, input_variable, output_variable, delay):
         Block.__init__(self, [input_variable], [output_variable], 1, 0)
         self.delay = delay
@@ -70,6 +72,28 @@ class Delay(Block):
             v1 = self.inputs[0]._values[it - delay_in_steps-1]
             v2 = self.inputs[0]._values[it - delay_in_steps]
             return (ts-delay_remainder)/ts*(v2-v1) +v1 
+
+    def StepOutputs(self, it, ts):
+        return (self.Evaluate(it, ts),)
+
+    EnsembleStepOutputs = StepOutputs
+
+    def HistoryLength(self, ts):
+        return int(self.delay // ts)+1
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        delay_in_steps = int(self.delay // ts)
+        delay_remainder = self.delay % ts
+        input_row = self._input_rows[0]
+        it = np.arange(it_start, it_end)
+        i1 = it - delay_in_steps - 1
+        valid = i1 >= 0
+        v1 = input_row[i1[valid]]
+        v2 = input_row[i1[valid]+1]
+        values = np.empty((it_end-it_start,)+input_row.shape[1:])
+        values[~valid] = self.inputs[0].initial_values[-1]
+        values[valid] = (ts-delay_remainder)/ts*(v2-v1) + v1
+        return [values]
             
     def Label(self):
         return 'delay'
@@ -95,18 +119,28 @@ class Saturation(Block):
         max_value: This is the upper bound for the output.
     """
 
+    __slots__ = ('min_value', 'max_value')
+
     def __init__(self, input_variable, output_variable, min_value, max_value):
         Block.__init__(self, [input_variable], [output_variable], 1, 0)
         self.min_value = min_value
         self.max_value = max_value
 
-    def Evaluate(self, it, ts):
-        value = self.InputValues(it)[0]
+    def _Value(self, value):
         if value < self.min_value:
             value = self.min_value
         elif value > self.max_value:
             value = self.max_value
-        return np.array([value])
+        return value
+
+    def Evaluate(self, it, ts):
+        return np.array([self._Value(self.InputValues(it)[0])])
+
+    def StepOutputs(self, it, ts):
+        return (self._Value(self._input_rows[0][it]),)
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        return [np.clip(self._input_rows[0][it_start:it_end], self.min_value, self.max_value)]
 
     def LabelBlock(self):
         return 'Sat'
@@ -118,14 +152,15 @@ class Coulomb(Block):
 
     """
 
+    __slots__ = ('max_value', 'tolerance')
+
     def __init__(self, input_variable, speed_variable, output_variable, max_value, tolerance=0):
         Block.__init__(self, [input_variable, speed_variable], [
                        output_variable], 1, 0)
         self.max_value = max_value
         self.tolerance = tolerance
 
-    def Evaluate(self, it, ts):
-        input_value, speed = self.InputValues(it)
+    def _Value(self, input_value, speed):
         if speed > self.tolerance:
             output = -self.max_value
         elif speed < -self.tolerance:
@@ -138,8 +173,21 @@ class Coulomb(Block):
                     output = self.max_value
                 else:
                     output = -self.max_value
+        return output
+
+    def Evaluate(self, it, ts):
+        return np.array([self._Value(*self.InputValues(it))])
+
+    def StepOutputs(self, it, ts):
+        input_row, speed_row = self._input_rows
+        return (self._Value(input_row[it], speed_row[it]),)
 
-        return np.array([output])
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        input_value, speed = [row[it_start:it_end] for row in self._input_rows]
+        locked = np.where(np.abs(input_value) < self.max_value, -input_value,
+                          np.where(input_value < 0, self.max_value, -self.max_value))
+        return [np.where(speed > self.tolerance, -self.max_value,
+                         np.where(speed < -self.tolerance, self.max_value, locked))]
 
     def LabelBlock(self):
         return 'Clb'
@@ -151,14 +199,15 @@ class CoulombVariableValue(Block):
         The max value is driven by an input
     """
 
+    __slots__ = ('tolerance',)
+
     def __init__(self, external_force, speed_variable, value_variable, output_variable, tolerance=0):
         Block.__init__(self, [external_force, speed_variable, value_variable], [
                        output_variable], 1, 0)
 #        self.max_value=max_value
         self.tolerance = tolerance
 
-    def Evaluate(self, it, ts):
-        external_force, speed, max_value = self.InputValues(it)
+    def _Value(self, external_force, speed, max_value):
         # Slipping
         if speed > self.tolerance:
             output = -max_value
@@ -177,6 +226,20 @@ class CoulombVariableValue(Block):
                     output = -max_value
         return output
 
+    def Evaluate(self, it, ts):
+        return self._Value(*self.InputValues(it))
+
+    def StepOutputs(self, it, ts):
+        force_row, speed_row, value_row = self._input_rows
+        return (self._Value(force_row[it], speed_row[it], value_row[it]),)
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        external_force, speed, max_value = [row[it_start:it_end] for row in self._input_rows]
+        locked = np.where(np.abs(external_force) < max_value, -external_force,
+                          np.where(external_force < 0, max_value, -max_value))
+        return [np.where(speed > self.tolerance, -max_value,
+                         np.where(speed < -self.tolerance, max_value, locked))]
+
     def LabelBlock(self):
         return 'Clb Var'
 
@@ -187,14 +250,15 @@ class RegCoulombVariableValue(Block):
         The max value is driven by an input
     """
 
+    __slots__ = ('tolerance',)
+
     def __init__(self, external_force, speed_variable, value_variable, output_variable, tolerance=0):
         Block.__init__(self, [external_force, speed_variable, value_variable], [
                        output_variable], 1, 0)
 #        self.max_value=max_value
         self.tolerance = tolerance
 
-    def Evaluate(self, it, ts):
-        external_force, speed, max_value = self.InputValues(it)
+    def _Value(self, external_force, speed, max_value):
         # Slipping
         if speed > self.tolerance:
             output = -max_value
@@ -213,6 +277,20 @@ class RegCoulombVariableValue(Block):
                     output = -max_value
         return output
 
+    def Evaluate(self, it, ts):
+        return self._Value(*self.InputValues(it))
+
+    def StepOutputs(self, it, ts):
+        force_row, speed_row, value_row = self._input_rows
+        return (self._Value(force_row[it], speed_row[it], value_row[it]),)
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        external_force, speed, max_value = [row[it_start:it_end] for row in self._input_rows]
+        locked = np.where(np.abs(external_force) < max_value, -external_force,
+                          np.where(external_force < 0, max_value, -max_value))
+        return [np.where(speed > self.tolerance, -max_value,
+                         np.where(speed < -self.tolerance, max_value, locked))]
+
     def LabelBlock(self):
         return 'Clb Var'
 
@@ -232,19 +310,29 @@ class Sign(Block):
         
     """
 
+    __slots__ = ()
+
     def __init__(self, input_variable, output_variable):
         Block.__init__(self, [input_variable], [output_variable], 1, 0)
 
-    def Evaluate(self, it, ts):
-        input_value = self.InputValues(it)[0]
+    def _Value(self, input_value):
         if input_value < 0:
             output = -1
         elif input_value > 0:
             output = 1
         else:
             output = 0
-#        print(input_value,speed,output)
-        return np.array([output])
+        return output
+
+    def Evaluate(self, it, ts):
+        return np.array([self._Value(self.InputValues(it)[0])])
+
+    def StepOutputs(self, it, ts):
+        return (self._Value(self._input_rows[0][it]),)
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        input_value = self._input_rows[0][it_start:it_end]
+        return [(input_value > 0).astype(float)-(input_value < 0)]
 
     def LabelBlock(self):
         return 'Sgn'
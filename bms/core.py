@@ -7,13 +7,150 @@ This file defines the base of BMS.
 """
 
 import numpy as np
+import gc
+import importlib
+import json
+import os
+import warnings
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
 #import numpy.random
-import matplotlib.pyplot as plt
 #import math
-import networkx as nx
-import dill
-from scipy.optimize import fsolve, root, minimize
 #import cma
+# matplotlib, networkx, dill and scipy are imported when they are first
+# used, as many simulations need only a part of them
+
+# Names imported by bms. Lazily imported modules are left out, as
+# from bms import * would import them
+__all__ = ['np', 'Variable', 'Signal', 'Block', 'AlgebraicLoop', 'NewtonAlgebraicLoop',
+           'EnsembleNewtonAlgebraicLoop', 'LinearAlgebraicLoop', 'LinearSystem',
+           'SimulationOptions', 'SimulationProfile', 'SimulationTrace', 'ModelError',
+           'DynamicSystem', 'Load',
+           'PhysicalNode', 'PhysicalBlock', 'PhysicalSystem']
+
+# Steps computed in float64 between copies of values to arrays of their
+# storage dtypes, see DynamicSystem.Simulate
+_STORAGE_CHUNK_SIZE = 10000
+
+# Linear algebraic loops and linear systems with more unknowns are solved
+# with sparse LU factorizations, dense ones being quadratic in memory
+_DENSE_SIZE = 200
+
+# Names of the lazily imported modules and functions, still available as
+# attributes of bms (see __getattr__)
+_LAZY_NAMES = {'plt': ('matplotlib.pyplot', None),
+               'nx': ('networkx', None),
+               'dill': ('dill', None),
+               'fsolve': ('scipy.optimize', 'fsolve'),
+               'root': ('scipy.optimize', 'root'),
+               'minimize': ('scipy.optimize', 'minimize'),
+               'lu_factor': ('scipy.linalg', 'lu_factor'),
+               'lu_solve': ('scipy.linalg', 'lu_solve'),
+               'get_lapack_funcs': ('scipy.linalg', 'get_lapack_funcs'),
+               'LinAlgWarning': ('scipy.linalg', 'LinAlgWarning')}
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+    module = importlib.import_module(module_name)
+    if attribute is None:
+        return module
+    return getattr(module, attribute)
+
+
+def _StorageShape(n, ensemble_size):
+    """
+    Shape of the values of a variable on n iterations: one column per member
+    for ensemble simulations
+    """
+    if ensemble_size is None:
+        return (n,)
+    return (n, ensemble_size)
+
+
+# Values of variables out of simulations
+_NO_VALUES = np.empty(0)
+_NO_VALUES.flags.writeable = False
+
+
+def _Matrix(entries, shape, sparse):
+    """
+    Matrix of the coefficients given as lists (rows, columns, values),
+    duplicates being summed
+
+    :param sparse: if True, returns a scipy.sparse CSC matrix, else an array
+    """
+    rows, columns, values = entries
+    if sparse:
+        from scipy.sparse import csc_matrix
+        return csc_matrix((values, (rows, columns)), shape=shape)
+    matrix = np.zeros(shape)
+    np.add.at(matrix, (np.array(rows, dtype=int), np.array(columns, dtype=int)), values)
+    return matrix
+
+
+def _SparseLU(matrix):
+    """
+    Sparse LU factorization of a square CSC matrix
+
+    :raises np.linalg.LinAlgError: if the matrix is singular
+    """
+    from scipy.sparse.linalg import splu
+    try:
+        return splu(matrix)
+    except RuntimeError as error:
+        raise np.linalg.LinAlgError(str(error))
+
+
+def _Attributes(item):
+    """
+    Attributes of an object, in its slots and in its dictionary
+    """
+    attributes = {}
+    for cls in type(item).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name not in ('__dict__', '__weakref__') and hasattr(item, name):
+                attributes[name] = getattr(item, name)
+    attributes.update(getattr(item, '__dict__', {}))
+    return attributes
+
+
+def _SetAttributes(item, attributes):
+    """
+    Sets the attributes of an object restored by pickle, including the ones
+    of objects saved when their class had no slots
+    """
+    for name, value in attributes.items():
+        setattr(item, name, value)
+
+
+def _RowsIndex(indices):
+    """
+    Index of the given rows of an array: a slice if they are evenly spaced,
+    which gives views without copy, an integer array otherwise
+    """
+    if len(indices) == 1:
+        return slice(indices[0], indices[0]+1)
+    if len(indices) > 1:
+        step = indices[1]-indices[0]
+        if step != 0 and all(i2-i1 == step for i1, i2 in zip(indices[:-1], indices[1:])):
+            stop = indices[-1]+step
+            return slice(indices[0], stop if stop >= 0 else None, step)
+    return np.array(indices, dtype=int)
+
+
+def _Window(values, rows, start, stop):
+    """
+    Copy of the values of some rows of an array on steps start to stop
+    """
+    window = values[rows, start:stop]
+    if isinstance(rows, slice):
+        # Basic indexing gives a view
+        return window.copy()
+    return window
 
 
 class Variable:
@@ -25,9 +162,19 @@ class Variable:
     otherwise names should be a tuple of strings (full_name,short_name) 
     
     :param hidden: inner variable to hide in plots if true
+    :param storage_dtype: floating point dtype in which values are stored by
+                          simulations, defaults to the one of the model (see
+                          DynamicSystem.Simulate). Values are still computed
+                          in float64
     """
-
-    def __init__(self, names='variable', initial_values=[0], hidden=False):
+    # Models generated from physical systems have many variables: attributes
+    # in slots. The attribute dictionary of other attributes set by users is
+    # only created when one is set
+    __slots__ = ('name', 'short_name', 'initial_values', '_values', 'max_order',
+                 'hidden', 'storage_dtype', '__dict__', '__weakref__')
+
+    def __init__(self, names='variable', initial_values=[0], hidden=False,
+                 storage_dtype=None):
         if type(names) == str:
             self.name = names
             self.short_name = names
@@ -39,26 +186,43 @@ class Variable:
                 raise TypeError
 
         self.initial_values = initial_values
-        self._values = np.array([])
+        self._values = _NO_VALUES
         self.max_order = 0
         self.hidden = hidden
+        self.storage_dtype = storage_dtype
 
-    def _InitValues(self, ns, ts, max_order):
+    def _InitValues(self, ns, ts, max_order, ensemble_size=None, values=None):
+        """
+        :param values: array in which values are stored, such as a row of the
+                       values of a DynamicSystem. Allocated if None
+        """
         self.max_order = max_order
-        self._values = self.initial_values[0]*np.ones(ns+max_order+1)
+        if values is None:
+            values = np.empty(_StorageShape(ns+max_order+1, ensemble_size))
+        self._values = values
+        self._values[:] = self.initial_values[0]
         self._ForwardValues()
 
     def _ForwardValues(self):
         pass
 
+    def __getstate__(self):
+        return _Attributes(self)
+
+    def __setstate__(self, state):
+        _SetAttributes(self, state)
+
     def _get_values(self):
-        return self._values[self.max_order:]
+        # Values are stored time first: members of ensembles as rows
+        return self._values[self.max_order:].T
 
     values = property(_get_values)
 
 
 class Signal(Variable):
     """ Abstract class of signal """
+    # No __slots__: signals are few in a model, their subclasses have
+    # parameters and their functions may be replaced on instances
 
     def __init__(self, names):
         if type(names) == str:
@@ -73,18 +237,49 @@ class Signal(Variable):
                 
 
 
-        self._values = np.array([])
+        self._values = _NO_VALUES
         self.max_order = 0
         self.hidden = False
+        self.storage_dtype = None
 
-    def _InitValues(self, ns, ts, max_order):
+    def _InitValues(self, ns, ts, max_order, ensemble_size=None, values=None):
         self.max_order = max_order
-        self._values = np.zeros(ns+max_order+1)
-        for i in range(ns+1):
-            self._values[i+max_order] = self.function(i*ts)
+        if values is None:
+            values = np.empty(_StorageShape(ns+max_order+1, ensemble_size))
+        self._values = values
+        self._values[:max_order] = 0.
+        self._FillValues(max_order, 0, ts)
         self._ForwardValues()
         self.initial_values = [self._values[0]]
 
+    def _FillValues(self, it_start, i_start, ts):
+        """
+        Writes the values of the signal from time step i_start in values from
+        iteration it_start to the end
+        """
+        t = ts*np.arange(i_start, i_start+len(self._values)-it_start)
+        if 'function' in self.__dict__ and hasattr(type(self), 'function'):
+            # Function of the class replaced on this signal: its vectorized
+            # evaluation no longer applies
+            values = Signal.Values(self, t)
+        else:
+            values = np.asarray(self.Values(t))
+        # Values common to all members of an ensemble
+        values = values.reshape(values.shape+(1,)*(self._values.ndim-values.ndim))
+        self._values[it_start:] = values
+
+    def Values(self, t):
+        """
+        Values of the signal at an array of times. Signals whose function
+        accepts arrays override it to evaluate all times in one call. When
+        such a class defines function as a method and it is replaced on an
+        instance, the new function is evaluated time by time instead.
+
+        :param t: 1D array of times
+        :returns: an array of values, of shape (len(t),) or
+                  (len(t), ensemble_size)
+        """
+        return np.array([self.function(ti) for ti in t], dtype=float)
 
     def _ForwardValues(self):
         """
@@ -95,7 +290,15 @@ class Signal(Variable):
 
 class Block:
     """ Abstract class of block: this class should not be instanciate directly
+
+    Attributes of blocks are in slots: subclasses list their attributes in
+    __slots__. Other attributes, e.g. set by users on a block, are in an
+    attribute dictionary created when the first one is set.
     """
+    __slots__ = ('inputs', 'outputs', 'n_inputs', 'n_outputs', 'max_input_order',
+                 'max_output_order', 'max_order', '_input_rows', '_output_rows',
+                 '_window_values', '_input_index', '_output_index', '__dict__',
+                 '__weakref__')
 
     def __init__(self, inputs, outputs, max_input_order, max_output_order):
         self.inputs = []
@@ -143,9 +346,15 @@ class Block:
     def InputValues(self, it, nsteps=None):
         """
             Returns the input values at a given iteration for solving the block outputs
+
+            It is a new array, which the block may modify: during a simulation,
+            values are copied from the values array of the model in one
+            operation instead of variable by variable.
         """
         if nsteps == None:
             nsteps = self.max_input_order
+        if getattr(self, '_window_values', None) is not None:
+            return _Window(self._window_values, self._input_index, it-nsteps+1, it+1)
 #        print(self,it)
         # Provides values in inputs values for computing at iteration it
         I = np.zeros((self.n_inputs, nsteps))
@@ -159,6 +368,8 @@ class Block:
         # Provides values in inputs values for computing at iteration it
         if nsteps == None:
             nsteps = self.max_output_order
+        if getattr(self, '_window_values', None) is not None:
+            return _Window(self._window_values, self._output_index, it-nsteps, it)
         O = np.zeros((self.n_outputs, nsteps))
         for iv, variable in enumerate(self.outputs):
             O[iv, :] = variable._values[it-nsteps:it]
@@ -169,6 +380,967 @@ class Block:
         for i, step_output in enumerate(step_outputs):
             self.outputs[i]._values[it] = step_output
 
+    def HistoryLength(self, ts):
+        """
+        Number of past iterations of its variables read by the block
+        """
+        return max(self.max_input_order-1, self.max_output_order)
+
+    def _Bind(self, store, input_indices, output_indices, values=None):
+        """
+        Binds the block to the rows of the value store of a compiled simulation.
+        Should not be used by end-user
+
+        :param values: array whose rows are the store, from which InputValues
+                       and OutputValues read windows of several steps
+        """
+        self._input_rows = [store[i] for i in input_indices]
+        self._output_rows = [store[i] for i in output_indices]
+        self._window_values = None
+        if values is not None:
+            self._window_values = values.view()
+            self._window_values.flags.writeable = False
+            self._input_index = _RowsIndex(input_indices)
+            self._output_index = _RowsIndex(output_indices)
+
+    def __getstate__(self):
+        # Values of the model are saved with its variables
+        state = _Attributes(self)
+        state['_window_values'] = None
+        return state
+
+    def __setstate__(self, state):
+        _SetAttributes(self, state)
+
+    def StepOutputs(self, it, ts):
+        """
+        Returns the sequence of output values at iteration it.
+
+        Blocks override it to read the rows bound by the compile stage directly
+        instead of copying windows with InputValues and OutputValues.
+        """
+        return np.ravel(self.Evaluate(it, ts))
+
+    def EnsembleStepOutputs(self, it, ts):
+        """
+        StepOutputs for ensemble simulations, where each value is an array of
+        the values of all members. Defaults to the whole-array evaluation on
+        one step, then to StepOutputs. Blocks whose StepOutputs is arithmetic
+        on the values make it an alias of StepOutputs.
+        """
+        trajectories = self.TrajectoryOutputs(it, it+1, ts)
+        if trajectories is None:
+            return self.StepOutputs(it, ts)
+        return [trajectory[0] for trajectory in trajectories]
+
+    def TrajectoryOutputs(self, it_start, it_end, ts):
+        """
+        Optional whole-array evaluation of the block, used when all its inputs
+        are known over the whole simulation before the time loop.
+
+        :returns: a list (one per output) of arrays of values from iteration
+                  it_start to it_end (excluded), or None if the block has to
+                  be evaluated step by step
+        """
+        return None
+
+    def LinearCoefficients(self, ts):
+        """
+        Coefficients of single output blocks whose output is a linear
+        combination with constant coefficients of its inputs and past outputs:
+
+        .. math:: y_{it} = \\sum_{j,k} I_{j,k} u_{j,it-k} + \\sum_{k \\geq 1} O_k y_{it-k} + offset
+
+        :returns: (I, O, offset) where I is a list (one per input) of
+                  coefficients for lags 0, 1, ... and O the coefficients for
+                  lags 1, 2, ..., or None if the block is not linear
+        """
+        return None
+
+
+class AlgebraicLoop:
+    """
+    Equations of a strongly connected component of the model that have to be
+    solved simultaneously at each time step. This generic solver uses fsolve.
+
+    After a simulation, iterations and function_evaluations give the cost of
+    the solve at each time step.
+
+    :param equations: list of tuples (block, index of output)
+    :param ensemble_size: number of members for ensemble simulations, which
+                          are solved member by member
+    """
+
+    def __init__(self, equations, ensemble_size=None):
+        self.equations = equations
+        self.ensemble_size = ensemble_size
+        self.rows = [block._output_rows[iov] for block, iov in equations]
+        self.variables = [block.outputs[iov] for block, iov in equations]
+        if ensemble_size is None:
+            self._evaluates = [(block.StepOutputs, iov) for block, iov in equations]
+        else:
+            self._evaluates = [(block.EnsembleStepOutputs, iov) for block, iov in equations]
+        self.max_order = 0
+        self._InitStatistics(-1, 0)
+
+    def _InitStatistics(self, ns, max_order):
+        """
+        Allocates per-step statistics, aligned with variables values
+        """
+        self.max_order = max_order
+        self._statistics = (np.zeros(ns+max_order+1, dtype=int),
+                            np.zeros(ns+max_order+1, dtype=int),
+                            np.ones(ns+max_order+1, dtype=bool),
+                            np.zeros(ns+max_order+1))
+        self._ShiftStatistics(0)
+
+    def _ShiftStatistics(self, offset):
+        """
+        Aligns the statistics written by solvers at iteration it of a values
+        buffer with iteration it+offset of the simulation
+        """
+        (self._iterations, self._function_evaluations, self._converged,
+         self._residual_norms) = [statistics[offset:] for statistics in self._statistics]
+
+    def __getstate__(self):
+        # LAPACK functions cannot be saved: they are fetched again on load
+        state = self.__dict__.copy()
+        if '_getrs' in state:
+            state['_getrs'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        if '_statistics' not in state:
+            # Saved when statistics were not shifted with values buffers
+            self._statistics = (self._iterations, self._function_evaluations,
+                                self._converged, self._residual_norms)
+
+    def _get_iterations(self):
+        return self._statistics[0][self.max_order:]
+
+    def _get_function_evaluations(self):
+        return self._statistics[1][self.max_order:]
+
+    def _get_converged(self):
+        return self._statistics[2][self.max_order:]
+
+    def _get_residual_norms(self):
+        return self._statistics[3][self.max_order:]
+
+    iterations = property(_get_iterations)
+    function_evaluations = property(_get_function_evaluations)
+    # Convergence flag of the solver and infinity norm of the final residual
+    converged = property(_get_converged)
+    residual_norms = property(_get_residual_norms)
+
+    def _SolverState(self):
+        """
+        Arrays of the solver state carried from one step to the next,
+        written in checkpoints
+        """
+        return {}
+
+    def _SetSolverState(self, state):
+        pass
+
+    def _KeepSolverStates(self):
+        """
+        Keeps what is needed to restore the solver state of any step, see
+        _Continue
+        """
+        pass
+
+    def _Continue(self, loop, it, ts):
+        """
+        Takes over from the loop solving the same equations in the previous
+        simulation: statistics of iterations before it and the solver state
+        it had before iteration it
+        """
+        for statistics, previous in zip(self._statistics, loop._statistics):
+            length = min(it, len(statistics), len(previous))
+            statistics[:length] = previous[:length]
+
+    def Residual(self, x, it, ts):
+        """
+        Writes the values proposed by the solver and returns the regrets
+        """
+        for row, xi in zip(self.rows, x):
+            row[it] = xi
+        return [xi-evaluate(it, ts)[iov]
+                for xi, (evaluate, iov) in zip(x, self._evaluates)]
+
+    def _MemberResidual(self, xm, x, m, it, ts):
+        """
+        Residual of member m of an ensemble, other members being fixed to x
+        """
+        x[:, m] = xm
+        return [r[m] for r in self.Residual(x, it, ts)]
+
+    def _SolveMembers(self, x, members, it, ts):
+        """
+        Solves with fsolve the given members of an ensemble one by one.
+
+        :returns: the number of function evaluations, True if all members
+                  converged, and the largest residual norm
+        """
+        from scipy.optimize import fsolve
+        evaluations = 0
+        converged = True
+        residual_norm = 0.
+        for m in members:
+            xm, infodict, ier, message = fsolve(self._MemberResidual, x[:, m].copy(),
+                                                args=(x, m, it, ts), full_output=True)
+            x[:, m] = xm
+            evaluations += infodict['nfev']
+            converged = converged and ier == 1
+            residual_norm = max(residual_norm, np.max(np.abs(infodict['fvec'])))
+        return evaluations, converged, residual_norm
+
+    def Solve(self, it, ts):
+        if self.ensemble_size is not None:
+            x = np.array([row[it-1] for row in self.rows])
+            (self._function_evaluations[it], self._converged[it],
+             self._residual_norms[it]) = self._SolveMembers(x, range(self.ensemble_size), it, ts)
+            return x
+
+        from scipy.optimize import fsolve
+        x0 = [row[it-1] for row in self.rows]
+        x, infodict, ier, message = fsolve(self.Residual, x0, args=(it, ts),
+                                           full_output=True)
+        self._function_evaluations[it] = infodict['nfev']
+        self._converged[it] = ier == 1
+        self._residual_norms[it] = np.max(np.abs(infodict['fvec']))
+        return x
+
+
+class NewtonAlgebraicLoop(AlgebraicLoop):
+    """
+    Nonlinear algebraic loop solved by a chord Newton method: the Jacobian,
+    computed by finite differences, is kept across steps and only refreshed
+    when convergence slows down. The starting point is extrapolated from the
+    solutions of the previous steps. If Newton fails, i.e. if the residual is
+    not contracted with an up-to-date Jacobian, fsolve is used for the step,
+    from the solution of the previous step.
+
+    :param predictor_order: 0 starts from the previous solution, 1 (linear)
+                            and 2 (quadratic) extrapolate the previous ones
+    :param tolerance: relative tolerance on residual
+    :param max_iterations: maximum number of iterations per step
+    :param contraction: refresh the Jacobian if residual is not divided by at
+                        least 1/contraction at each iteration
+    """
+
+    def __init__(self, equations, predictor_order=1, tolerance=1e-10,
+                 max_iterations=10, contraction=0.1, ensemble_size=None):
+        AlgebraicLoop.__init__(self, equations, ensemble_size)
+        self.predictor_order = predictor_order
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.contraction = contraction
+        n = len(equations)
+        self._lu = None
+        self._getrs = None
+        self._newton_failed = False
+        self._g = np.zeros(n)
+        self._g2 = np.zeros(n)
+        # Point of the last Jacobian computed at each iteration, if kept
+        self._jacobian_points = None
+
+    def _Residual(self, x, it, ts, g):
+        for row, xi in zip(self.rows, x):
+            row[it] = xi
+        for i, (evaluate, iov) in enumerate(self._evaluates):
+            g[i] = x[i]-evaluate(it, ts)[iov]
+
+    def _Predict(self, it):
+        order = min(self.predictor_order, it-1)
+        if order <= 0:
+            return np.array([row[it-1] for row in self.rows])
+        elif order == 1:
+            return np.array([2*row[it-1]-row[it-2] for row in self.rows])
+        return np.array([3*row[it-1]-3*row[it-2]+row[it-3] for row in self.rows])
+
+    def _RefreshJacobian(self, x, g, it, ts):
+        if self._jacobian_points is not None:
+            self._jacobian_points[it] = x.copy()
+        return self._UpdateJacobian(x, g, it, ts)
+
+    def _UpdateJacobian(self, x, g, it, ts):
+        """
+        Finite differences Jacobian of the residual at x, factorized.
+        Returns False if it is singular
+        """
+        from scipy.linalg import lu_factor, get_lapack_funcs, LinAlgWarning
+        n = len(x)
+        J = np.empty((n, n))
+        g2 = self._g2
+        for j in range(n):
+            h = 1.49e-8*max(abs(x[j]), 1.)
+            xj = x[j]
+            x[j] = xj+h
+            self._Residual(x, it, ts, g2)
+            J[:, j] = (g2-g)/h
+            x[j] = xj
+        self._lu = None
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', LinAlgWarning)
+            lu = lu_factor(J, check_finite=False)
+        if not np.all(np.isfinite(lu[0])) or np.any(np.diag(lu[0]) == 0):
+            return False
+        self._lu = lu
+        if self._getrs is None:
+            self._getrs, = get_lapack_funcs(('getrs',), (lu[0],))
+        return True
+
+    def Solve(self, it, ts):
+        if self._newton_failed:
+            # Newton failed at previous step: generic solver until it converges
+            return self._FallbackSolve(it, ts, 0, 0)
+        x = self._Predict(it)
+        g = self._g
+        self._Residual(x, it, ts, g)
+        evaluations = 1
+        iterations = 0
+        norm = abs(g).max()
+        refresh = self._lu is None
+        while norm > self.tolerance*(1+abs(x).max()):
+            if iterations == self.max_iterations:
+                break
+            if refresh:
+                evaluations += len(x)
+                if not self._RefreshJacobian(x, g, it, ts):
+                    break
+            dx, info = self._getrs(self._lu[0], self._lu[1], g)
+            x -= dx
+            self._Residual(x, it, ts, g)
+            evaluations += 1
+            iterations += 1
+            new_norm = abs(g).max()
+            if (not new_norm <= self.contraction*norm
+                    and new_norm > self.tolerance*(1+abs(x).max())):
+                # Slow or diverging: Newton fails if the Jacobian is
+                # up-to-date, else it is refreshed
+                if refresh:
+                    break
+                refresh = True
+                if not new_norm < norm:
+                    x += dx
+                    self._Residual(x, it, ts, g)
+                    evaluations += 1
+                    continue
+            else:
+                refresh = False
+            norm = new_norm
+        else:
+            self._iterations[it] = iterations
+            self._function_evaluations[it] = evaluations
+            self._converged[it] = True
+            self._residual_norms[it] = norm
+            return x
+
+        return self._FallbackSolve(it, ts, iterations, evaluations)
+
+    def __setstate__(self, state):
+        state.setdefault('_jacobian_points', None)
+        AlgebraicLoop.__setstate__(self, state)
+        if self._lu is not None:
+            from scipy.linalg import get_lapack_funcs
+            self._getrs, = get_lapack_funcs(('getrs',), (self._lu[0],))
+
+    def _SolverState(self):
+        state = {'newton_failed': np.array(self._newton_failed)}
+        if self._lu is not None:
+            state['lu'], state['piv'] = self._lu
+        return state
+
+    def _SetSolverState(self, state):
+        from scipy.linalg import get_lapack_funcs
+        self._newton_failed = bool(state['newton_failed'])
+        if 'lu' in state:
+            self._lu = (state['lu'], state['piv'])
+            self._getrs, = get_lapack_funcs(('getrs',), (self._lu[0],))
+
+    def _KeepSolverStates(self):
+        self._jacobian_points = {}
+
+    def _Continue(self, loop, it, ts):
+        AlgebraicLoop._Continue(self, loop, it, ts)
+        if loop._jacobian_points is None:
+            # Points not kept: state at the end of the previous simulation
+            self._SetSolverState(loop._SolverState())
+            return
+        # Newton failed at a step if and only if the step was not converged
+        self._newton_failed = not loop._statistics[2][it-1]
+        points = {i: x for i, x in loop._jacobian_points.items() if i < it}
+        if points:
+            # The Jacobian is computed again where it was last refreshed, the
+            # values of loop variables at this iteration being kept
+            last = max(points)
+            values = [row[last].copy() for row in self.rows]
+            x = points[last].copy()
+            self._Residual(x, last, ts, self._g)
+            self._UpdateJacobian(x, self._g, last, ts)
+            for row, value in zip(self.rows, values):
+                row[last] = value
+        if self._jacobian_points is not None:
+            self._jacobian_points.update(points)
+
+    def _FallbackSolve(self, it, ts, iterations, evaluations):
+        from scipy.optimize import fsolve
+        # Started from the previous solution, as by the fsolve solver: the
+        # last Newton iterate may be far from it on discontinuities
+        x0 = [row[it-1] for row in self.rows]
+        x, infodict, ier, message = fsolve(self.Residual, x0, args=(it, ts),
+                                           full_output=True)
+        self._newton_failed = ier != 1
+        self._iterations[it] = iterations
+        self._function_evaluations[it] = evaluations+infodict['nfev']
+        self._converged[it] = ier == 1
+        self._residual_norms[it] = np.max(np.abs(infodict['fvec']))
+        return x
+
+
+class EnsembleNewtonAlgebraicLoop(NewtonAlgebraicLoop):
+    """
+    NewtonAlgebraicLoop for ensemble simulations: all members are iterated
+    together, each one with its own Jacobian. Members for which Newton fails
+    are then solved one by one by fsolve.
+    """
+
+    def __init__(self, equations, ensemble_size, **kwargs):
+        NewtonAlgebraicLoop.__init__(self, equations, ensemble_size=ensemble_size, **kwargs)
+        n = len(equations)
+        self._g = np.zeros((n, ensemble_size))
+        self._g2 = np.zeros((n, ensemble_size))
+        self._J_inv = None
+
+    def _UpdateJacobian(self, x, g, it, ts):
+        """
+        Finite differences Jacobians of the residual of each member at x,
+        inverted. Returns False if one is singular
+        """
+        n = len(x)
+        J = np.empty((self.ensemble_size, n, n))
+        g2 = self._g2
+        for j in range(n):
+            h = 1.49e-8*np.maximum(np.abs(x[j]), 1.)
+            xj = x[j].copy()
+            x[j] = xj+h
+            self._Residual(x, it, ts, g2)
+            J[:, :, j] = ((g2-g)/h).T
+            x[j] = xj
+        self._J_inv = None
+        try:
+            J_inv = np.linalg.inv(J)
+        except np.linalg.LinAlgError:
+            return False
+        if not np.all(np.isfinite(J_inv)):
+            return False
+        self._J_inv = J_inv
+        return True
+
+    def _SolverState(self):
+        if self._J_inv is None:
+            return {}
+        return {'J_inv': self._J_inv}
+
+    def _SetSolverState(self, state):
+        self._J_inv = state.get('J_inv')
+
+    def Solve(self, it, ts):
+        x = self._Predict(it)
+        g = self._g
+        self._Residual(x, it, ts, g)
+        evaluations = 1
+        iterations = 0
+        norm = abs(g).max(axis=0)
+        refresh = self._J_inv is None
+        unconverged = norm > self.tolerance*(1+abs(x).max(axis=0))
+        while np.any(unconverged):
+            if iterations == self.max_iterations:
+                break
+            if refresh:
+                evaluations += len(x)
+                if not self._RefreshJacobian(x, g, it, ts):
+                    break
+            dx = np.einsum('mij,jm->im', self._J_inv, g)
+            x -= dx
+            self._Residual(x, it, ts, g)
+            evaluations += 1
+            iterations += 1
+            new_norm = abs(g).max(axis=0)
+            new_unconverged = new_norm > self.tolerance*(1+abs(x).max(axis=0))
+            stalled = unconverged & new_unconverged & ~(new_norm <= self.contraction*norm)
+            if np.any(stalled):
+                # Slow or diverging: Newton fails if Jacobians are
+                # up-to-date, else they are refreshed
+                if refresh:
+                    norm, unconverged = new_norm, new_unconverged
+                    break
+                refresh = True
+                diverging = stalled & ~(new_norm < norm)
+                if np.any(diverging):
+                    x[:, diverging] += dx[:, diverging]
+                    self._Residual(x, it, ts, g)
+                    evaluations += 1
+                    new_norm = abs(g).max(axis=0)
+                    new_unconverged = new_norm > self.tolerance*(1+abs(x).max(axis=0))
+            else:
+                refresh = False
+            norm, unconverged = new_norm, new_unconverged
+
+        converged = True
+        residual_norm = np.max(norm[~unconverged], initial=0.)
+        if np.any(unconverged):
+            members = np.nonzero(unconverged)[0]
+            # Started from the previous solution, as by the fsolve solver
+            x[:, members] = [row[it-1][members] for row in self.rows]
+            member_evaluations, converged, members_norm = self._SolveMembers(
+                x, members, it, ts)
+            evaluations += member_evaluations
+            residual_norm = max(residual_norm, members_norm)
+        self._iterations[it] = iterations
+        self._function_evaluations[it] = evaluations
+        self._converged[it] = converged
+        self._residual_norms[it] = residual_norm
+        return x
+
+
+class LinearAlgebraicLoop(AlgebraicLoop):
+    """
+    Algebraic loop made of linear blocks. Its equations read:
+
+    .. math:: x = A x + f(0)
+
+    where A couples the values of the loop variables at the current step and
+    f(0) is the output of the blocks when these values are set to zero.
+    I-A is factorized once: each step only costs the evaluation of the blocks
+    and a back-substitution. Loops of more than _DENSE_SIZE variables use a
+    sparse factorization.
+
+    :param equations: list of tuples (block, index of output) of linear blocks
+    :param ensemble_size: number of members for ensemble simulations
+    """
+
+    def __init__(self, equations, ts, ensemble_size=None):
+        from scipy.linalg import lu_factor, get_lapack_funcs, LinAlgWarning
+        AlgebraicLoop.__init__(self, equations, ensemble_size)
+        loop_variables = {block.outputs[iov]: i for i, (block, iov) in enumerate(equations)}
+        n = len(equations)
+        # Coefficients of I-A
+        entries = (list(range(n)), list(range(n)), [1.]*n)
+        for i, (block, iov) in enumerate(equations):
+            I, O, offset = block.LinearCoefficients(ts)
+            for variable, Ij in zip(block.inputs, I):
+                if variable in loop_variables and len(Ij) > 0:
+                    entries[0].append(i)
+                    entries[1].append(loop_variables[variable])
+                    entries[2].append(-Ij[0])
+
+        self.lu = None
+        self._matrix = None
+        self._splu = None
+        if n > _DENSE_SIZE:
+            self._matrix = _Matrix(entries, (n, n), True)
+            self._splu = _SparseLU(self._matrix)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', LinAlgWarning)
+                self.lu = lu_factor(_Matrix(entries, (n, n), False))
+            if np.any(np.diag(self.lu[0]) == 0):
+                raise np.linalg.LinAlgError('Singular algebraic loop')
+            # LAPACK back-substitution, called directly to avoid per-step overhead
+            self._getrs, = get_lapack_funcs(('getrs',), (self.lu[0],))
+        self._f0 = np.zeros(_StorageShape(n, ensemble_size))
+
+    def __getstate__(self):
+        # Sparse factorizations cannot be saved: they are computed again on load
+        state = AlgebraicLoop.__getstate__(self)
+        if state.get('_splu') is not None:
+            state['_splu'] = None
+        return state
+
+    def __setstate__(self, state):
+        from scipy.linalg import get_lapack_funcs
+        state.setdefault('_matrix', None)
+        state.setdefault('_splu', None)
+        AlgebraicLoop.__setstate__(self, state)
+        if self._matrix is not None:
+            self._splu = _SparseLU(self._matrix)
+        else:
+            self._getrs, = get_lapack_funcs(('getrs',), (self.lu[0],))
+
+    def Solve(self, it, ts):
+        for row in self.rows:
+            row[it] = 0.
+        f0 = self._f0
+        for i, (evaluate, iov) in enumerate(self._evaluates):
+            f0[i] = evaluate(it, ts)[iov]
+        if self._splu is not None:
+            return self._splu.solve(f0)
+        x, info = self._getrs(self.lu[0], self.lu[1], f0)
+        return x
+
+
+def _ConstantCoefficients(coefficients):
+    """
+    True if the linear coefficients (I, O, offset) of a block are scalars,
+    i.e. if they are the same for all members of an ensemble
+    """
+    I, O, offset = coefficients
+    return (np.ndim(offset) == 0 and all(np.ndim(o) == 0 for o in O)
+            and all(np.ndim(c) == 0 for Ij in I for c in Ij))
+
+
+class LinearSystem:
+    """
+    Discrete-time recurrence assembled from linear blocks:
+
+    .. math:: x_{it} = \\sum_{k \\geq 1} F_k x_{it-k} + w_{it}
+
+    x are the outputs of the blocks and w gathers the contributions of the
+    other variables (signals) and of offsets, computed at once for all steps.
+    Algebraic loops are solved once for all when assembling the system.
+
+    Systems of more than _DENSE_SIZE unknowns keep the sparse matrices of
+    the blocks equations, I-A_0 being factorized by a sparse LU, instead of
+    the dense F_k: each step then solves
+
+    .. math:: (I-A_0) x_{it} = \sum_{k \geq 1} A_k x_{it-k} + (I-A_0) w_{it}
+
+    :param blocks: linear blocks, having one output each
+    :param store: value store of the compiled simulation
+    :param variables_indices: dict of indices of variables in store
+    """
+
+    def __init__(self, blocks, store, variables_indices, ts):
+        from scipy.linalg import lu_factor, lu_solve, LinAlgWarning
+        self.store = store
+        self.unknowns = [variables_indices[block.outputs[0]] for block in blocks]
+        iunknowns = {iv: i for i, iv in enumerate(self.unknowns)}
+        self.knowns = []
+        iknowns = {}
+        coefficients = []
+        for block in blocks:
+            I, O, offset = block.LinearCoefficients(ts)
+            coefficients.append((block, I, O, offset))
+            for variable in block.inputs:
+                iv = variables_indices[variable]
+                if iv not in iunknowns and iv not in iknowns:
+                    iknowns[iv] = len(self.knowns)
+                    self.knowns.append(iv)
+
+        self.order = max([len(O) for _, _, O, _ in coefficients]
+                         + [len(Ij)-1 for _, I, _, _ in coefficients for Ij in I]
+                         + [0])
+        n = len(self.unknowns)
+        # Coefficients (rows, columns, values) of I-A_0, of A_k for k >= 1
+        # and of B_k
+        A = [(list(range(n)), list(range(n)), [1.]*n)]+[([], [], []) for k in range(self.order)]
+        B = [([], [], []) for k in range(self.order+1)]
+        c = np.zeros(n)
+        for ib, (block, I, O, offset) in enumerate(coefficients):
+            c[ib] = offset
+            for k, ok in enumerate(O):
+                for entries, value in zip(A[k+1], (ib, ib, ok)):
+                    entries.append(value)
+            for variable, Ij in zip(block.inputs, I):
+                iv = variables_indices[variable]
+                for k, ijk in enumerate(Ij):
+                    if iv in iunknowns:
+                        entry = (ib, iunknowns[iv], -ijk if k == 0 else ijk)
+                        for entries, value in zip(A[k], entry):
+                            entries.append(value)
+                    else:
+                        for entries, value in zip(B[k], (ib, iknowns[iv], ijk)):
+                            entries.append(value)
+
+        self.sparse = n > _DENSE_SIZE
+        if self.sparse:
+            from scipy.sparse import hstack
+            self._splu = _SparseLU(_Matrix(A[0], (n, n), True))
+            # Coefficients of past values, from oldest to newest
+            self.F = None
+            if self.order:
+                self.F = hstack([_Matrix(A[k], (n, n), True)
+                                 for k in range(self.order, 0, -1)], format='csr')
+            self.G = [_Matrix(Bk, (n, len(self.knowns)), True).tocsr() for Bk in B]
+            self.h = self._splu.solve(c)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', LinAlgWarning)
+                lu = lu_factor(_Matrix(A[0], (n, n), False))
+            if np.any(np.diag(lu[0]) == 0):
+                raise np.linalg.LinAlgError('Singular algebraic loop')
+            # Coefficients of past values, from oldest to newest
+            self.F = np.hstack([np.zeros((n, 0))]+[lu_solve(lu, _Matrix(A[k], (n, n), False))
+                                                   for k in range(self.order, 0, -1)])
+            self.G = [lu_solve(lu, _Matrix(Bk, (n, len(self.knowns)), False)) for Bk in B]
+            self.h = lu_solve(lu, c)
+
+    def Simulate(self, it_start, it_end):
+        """
+        Computes values of unknowns from iteration it_start to it_end (excluded)
+        """
+        # Time first, then unknowns (and members of ensembles)
+        X = np.moveaxis(np.array([self.store[iv] for iv in self.unknowns]), 0, 1).copy()
+        member_shape = X.shape[2:]
+        # Contribution of known variables and offsets
+        W = np.empty((it_end-it_start,)+X.shape[1:])
+        W[:] = self.h.reshape(self.h.shape+(1,)*len(member_shape))
+        if self.knowns:
+            U = np.moveaxis(np.array([self.store[iv] for iv in self.knowns]), 0, 1)
+            if self.sparse:
+                # Unknowns first, then all steps (and members) as columns
+                U = np.moveaxis(U, 1, 0)
+                BU = sum(Gk @ U[:, it_start-k:it_end-k].reshape((len(self.knowns), -1))
+                         for k, Gk in enumerate(self.G))
+                W += np.moveaxis(self._splu.solve(BU).reshape((len(self.h),)+W.shape[:1]+member_shape),
+                                 0, 1)
+            else:
+                for k, Gk in enumerate(self.G):
+                    W += np.einsum('ij,tj...->ti...', Gk, U[it_start-k:it_end-k], optimize=True)
+
+        if self.order == 0:
+            X[it_start:it_end] = W
+        elif self.sparse:
+            F = self.F
+            order = self.order
+            solve = self._splu.solve
+            for it in range(it_start, it_end):
+                X[it] = solve(F @ X[it-order:it].reshape((-1,)+member_shape))
+                X[it] += W[it-it_start]
+        else:
+            F = self.F
+            order = self.order
+            for it in range(it_start, it_end):
+                np.dot(F, X[it-order:it].reshape((-1,)+member_shape), out=X[it])
+                X[it] += W[it-it_start]
+
+        for i, iv in enumerate(self.unknowns):
+            self.store[iv][it_start:it_end] = X[it_start:it_end, i]
+
+
+class SimulationProfile:
+    """
+    Cumulative time and number of calls of blocks and algebraic loops during
+    a simulation, available in profile attribute of DynamicSystem after
+    Simulate(profile=True). Time of a loop includes the evaluations of its
+    blocks, which are also reported.
+    """
+
+    def __init__(self):
+        self._records = {}  # [calls, time] by block, loop or linear system
+        self.time = 0.  # Total time of the simulation
+
+    def Timed(self, item, function):
+        """
+        Returns function wrapped to add its calls and time to the record of item
+        """
+        record = self._records.setdefault(item, [0, 0.])
+
+        def timed_function(*args):
+            start = perf_counter()
+            result = function(*args)
+            record[1] += perf_counter()-start
+            record[0] += 1
+            return result
+        return timed_function
+
+    def Table(self):
+        """
+        Machine-readable profile
+
+        :returns: a list of dicts, one per block, loop or linear system,
+                  sorted by decreasing time. Loops also give the statistics
+                  of their solver
+        """
+        table = []
+        for item, (calls, time) in self._records.items():
+            if isinstance(item, AlgebraicLoop):
+                kind = 'loop'
+            elif isinstance(item, LinearSystem):
+                kind = 'linear system'
+            else:
+                kind = 'block'
+            entry = {'kind': kind, 'name': _ItemName(item), 'calls': calls, 'time': time}
+            if isinstance(item, AlgebraicLoop):
+                entry.update(function_evaluations=int(np.sum(item.function_evaluations)),
+                             unconverged_steps=int(np.sum(~item.converged)),
+                             max_residual_norm=float(np.max(item.residual_norms, initial=0.)))
+            table.append(entry)
+        table.sort(key=lambda entry: entry['time'], reverse=True)
+        return table
+
+    def Report(self):
+        """
+        Profile as a text table sorted by decreasing time
+        """
+        lines = ['Simulation time: {:.4g}s'.format(self.time),
+                 '{:>10} {:>6} {:>10} {:>12}  {}'.format('time (s)', '%', 'calls',
+                                                         'per call (s)', 'name')]
+        for entry in self.Table():
+            line = '{:>10.4g} {:>6.1f} {:>10} {:>12.3g}  {}'.format(
+                entry['time'], 100*entry['time']/self.time if self.time else 0.,
+                entry['calls'], entry['time']/max(entry['calls'], 1), entry['name'])
+            if entry['kind'] == 'loop':
+                line += ' [{} evaluations, {} unconverged steps, max residual {:.3g}]'.format(
+                    entry['function_evaluations'], entry['unconverged_steps'],
+                    entry['max_residual_norm'])
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+class SimulationTrace:
+    """
+    Timeline of a simulation in Chrome trace event format, which can be
+    opened in chrome://tracing, Perfetto or speedscope. Recorded by
+    DynamicSystem.Simulate(trace_file=...) with spans of the resolution
+    order, initialization of variables, evaluation of signals, chunks of
+    steps, checkpoint I/O, garbage collections and each solve of algebraic
+    loops.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._origin = perf_counter()
+        self._collection_start = None
+
+    def _Time(self):
+        # Timestamps of trace events are in microseconds
+        return 1e6*(perf_counter()-self._origin)
+
+    def _AddSpan(self, name, category, start, args=None):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start,
+                 'dur': self._Time()-start, 'pid': os.getpid(), 'tid': 0}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    @contextmanager
+    def Span(self, name, category, **args):
+        """
+        Context manager recording its duration as a span
+        """
+        start = self._Time()
+        try:
+            yield
+        finally:
+            self._AddSpan(name, category, start, args)
+
+    def Timed(self, name, category, function):
+        """
+        Returns function wrapped to record each of its calls as a span
+        """
+        def traced_function(*args):
+            start = self._Time()
+            result = function(*args)
+            self._AddSpan(name, category, start)
+            return result
+        return traced_function
+
+    def _GarbageCollection(self, phase, info):
+        if phase == 'start':
+            self._collection_start = self._Time()
+        elif self._collection_start is not None:
+            self._AddSpan('garbage collection', 'gc', self._collection_start,
+                          {'generation': info['generation'], 'collected': info['collected']})
+            self._collection_start = None
+
+    def Write(self, trace_file):
+        with open(trace_file, 'w') as file:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, file)
+
+
+class SimulationOptions:
+    """
+    Options of the execution of simulations, shared by DynamicSystem.Simulate
+    and SimulateChunks: they select how values are computed and stored. The
+    options of the last simulation of a model are in its simulation_options
+    attribute, and are used by Resume. In Simulate and SimulateChunks, each
+    option may also be given as a keyword, which takes precedence::
+
+        options = bms.SimulationOptions(loop_solver='fsolve', storage_dtype='float32')
+        ds.Simulate(options=options)
+        ds.Simulate(options=options, loop_solver='newton')
+
+    :param linear_fast_path: if True and all blocks are linear, the model is
+                             advanced as a single linear recurrence instead
+                             of block by block
+    :param vectorize_feed_forward: if True, blocks depending only on signals
+                                   are evaluated over all time steps at once
+                                   before the time loop
+    :param loop_solver: solver of nonlinear algebraic loops: 'newton'
+                        (Jacobian reuse and extrapolated starting point)
+                        or 'fsolve'. Solvers are then available in
+                        algebraic_loops attribute with their statistics
+    :param ensemble_size: if given, simulates this number of variants of
+                          the model at once. Block parameters may then be
+                          arrays of this size, one value per member, and
+                          values of variables are arrays of shape
+                          (ensemble_size, ns+1)
+    :param storage_dtype: floating point dtype in which values of variables
+                          are stored, unless they have their own
+                          storage_dtype. With dtypes other than float64,
+                          values are computed in float64 in a buffer of
+                          chunks of steps, then copied to arrays of their
+                          storage dtype. Such simulations cannot be resumed
+    """
+
+    def __init__(self, linear_fast_path=True, vectorize_feed_forward=True,
+                 loop_solver='newton', ensemble_size=None, storage_dtype='float64'):
+        self.linear_fast_path = linear_fast_path
+        self.vectorize_feed_forward = vectorize_feed_forward
+        self.loop_solver = loop_solver
+        self.ensemble_size = ensemble_size
+        self.storage_dtype = storage_dtype
+
+    def Replace(self, **options):
+        """
+        Returns a copy of the options with the given ones changed
+
+        :raises TypeError: if an option is unknown
+        """
+        attributes = dict(self.__dict__)
+        for name, value in options.items():
+            if name not in attributes:
+                raise TypeError('Unknown simulation option: '+name)
+            attributes[name] = value
+        return SimulationOptions(**attributes)
+
+    def __repr__(self):
+        return 'SimulationOptions({})'.format(
+            ', '.join('{}={!r}'.format(name, value) for name, value in self.__dict__.items()))
+
+
+def _ItemName(item):
+    """
+    Name of a block, loop or linear system in profiles and traces
+    """
+    if isinstance(item, AlgebraicLoop):
+        return '{}({})'.format(item.__class__.__name__,
+                               ', '.join(variable.name for variable in item.variables))
+    if isinstance(item, LinearSystem):
+        return 'LinearSystem({} unknowns)'.format(len(item.unknowns))
+    return '{} -> {}'.format(item.__class__.__name__,
+                             ', '.join(variable.name for variable in item.outputs))
+
+
+def _Reachable(graph, nodes):
+    """
+    Nodes of a directed graph reachable from the given ones (included), in a
+    single pass on the graph
+    """
+    reached = set(nodes)
+    stack = list(reached)
+    while stack:
+        for successor in graph.successors(stack.pop()):
+            if successor not in reached:
+                reached.add(successor)
+                stack.append(successor)
+    return reached
+
 
 class ModelError(Exception):
     def __init__(self, message):
@@ -196,6 +1368,14 @@ class DynamicSystem:
         self.blocks = []
         self.variables = []
         self.signals = []
+        self._added_variables = set()  # Signals and variables, for fast lookups
+        self.algebraic_loops = []
+        self.ensemble_size = None
+        self.simulation_options = None  # Of the last simulation
+        self.profile = None
+        self.trace = None
+        self._values = None  # Values of variables then signals, see values
+        self._decimations = None  # Of variables recorded by the last simulation
 
         self.max_order = 0
 
@@ -203,6 +1383,7 @@ class DynamicSystem:
             self.AddBlock(block)
 
         self._utd_graph = False  # True if graph is up-to-date
+        self._resolution_orders = {}  # Cache by variables to solve
 
     def AddBlock(self, block):
         """
@@ -218,22 +1399,28 @@ class DynamicSystem:
             print(block)
             raise TypeError
         self._utd_graph = False
+        self._resolution_orders = {}
+        self._resume_options = None
 
     def _AddVariable(self, variable):
         """
         Add a variable to the model. Should not be used by end-user
         """
         if isinstance(variable, Signal):
-            if not variable in self.signals:
+            if not variable in self._added_variables:
+                self._added_variables.add(variable)
                 self.signals.append(variable)
         elif isinstance(variable, Variable):
-            if not variable in self.variables:
+            if not variable in self._added_variables:
+                self._added_variables.add(variable)
                 self.variables.append(variable)
         else:
             raise TypeError
         self._utd_graph = False
+        self._resolution_orders = {}
 
     def _get_Graph(self):
+        import networkx as nx
         if not self._utd_graph:
             # Generate graph
             self._graph = nx.DiGraph()
@@ -253,34 +1440,34 @@ class DynamicSystem:
 
     def _ResolutionOrder(self, variables_to_solve):
         """
-        return a list of lists of tuples (block,output,ndof) to be solved
+        return a list of lists of tuples (block,output,ndof) to be solved.
+        Orders are cached until the model is modified by AddBlock.
 
         """
-#    Gp=nx.DiGraph()
-#
-#    for i in range(nvar):
-#        Gp.add_node('v'+str(i),bipartite=0)
-#
-#    for i in range(neq):
-#        Gp.add_node('e'+str(i),bipartite=1)
-#        for j in range(nvar):
-#            if Mo[i,j]==1:
-#                Gp.add_edge('e'+str(i),'v'+str(j))
-
+        key = frozenset(variables_to_solve)
+        try:
+            return self._resolution_orders[key]
+        except KeyError:
+            order = self._ComputeResolutionOrder(variables_to_solve)
+            self._resolution_orders[key] = order
+            return order
+
+    def _ComputeResolutionOrder(self, variables_to_solve):
+        import networkx as nx
+        # Graph of integer nodes: variables, then outputs of blocks (equations)
+        variables_indices = {variable: i for i, variable in enumerate(self.variables)}
+        equations = [(block, iov) for block in self.blocks
+                     for iov in range(len(block.outputs))]
+        nv = len(self.variables)
         Gp = nx.DiGraph()
-        for variable in self.variables:
-            Gp.add_node(variable, bipartite=0)
-        for block in self.blocks:
-            for iov, output_variable in enumerate(block.outputs):
-                Gp.add_node((block, iov), bipartite=1)
-                Gp.add_edge((block, iov), output_variable)
-                Gp.add_edge(output_variable, (block, iov))
-                for input_variable in block.inputs:
-                    if not isinstance(input_variable, Signal):
-                        Gp.add_edge(input_variable, (block, iov))
-
-    #    for n1,n2 in M.items():
-    #        Gp.add_edge(n1,n2)
+        Gp.add_nodes_from(range(nv+len(equations)))
+        for ie, (block, iov) in enumerate(equations):
+            iv = variables_indices[block.outputs[iov]]
+            Gp.add_edge(nv+ie, iv)
+            Gp.add_edge(iv, nv+ie)
+            for input_variable in block.inputs:
+                if not isinstance(input_variable, Signal):
+                    Gp.add_edge(variables_indices[input_variable], nv+ie)
 
         sinks = []
         sources = []
@@ -290,200 +1477,746 @@ class DynamicSystem:
             elif Gp.in_degree(node) == 0:
                 sources.append(node)
 
-        G2 = sources[:]
-        for node in sources:
-            for node2 in nx.descendants(Gp, node):
-                if node2 not in G2:
-                    G2.append(node2)
-
-        if G2 != []:
-            print(G2)
+        if sources != []:
+            nodes = self.variables+equations
+            print([nodes[node] for node in _Reachable(Gp, sources)])
             raise ModelError('Overconstrained variables')
 
-        G3 = sinks[:]
-        for node in sinks:
-            for node2 in nx.ancestors(Gp, node):
-                if node2 not in G3:
-                    G3.append(node2)
-
-        if G3 != []:
+        if sinks != []:
             raise ModelError('Underconstrained variables')
 
-#        vars_resolvables=[]
-#        for var in vars_resoudre:
-#            if not 'v'+str(var) in G2+G3:
-#                vars_resolvables.append(var)
-
-
-#        G1=Gp.copy()
-#        G1.remove_nodes_from(G2+G3)
-#
-#        M1=nx.bipartite.maximum_matching(G1)
-#        G1p=nx.DiGraph()
-#
-#        G1p.add_nodes_from(G1.nodes())
-#        for e in G1.edges():
-#            # equation vers variable
-#            if e[0][0]=='v':
-#                G1p.add_edge(e[0],e[1])
-#            else:
-#                G1p.add_edge(e[1],e[0])
-#    #    print(len(M))
-#        for n1,n2 in M1.items():
-#    #        print(n1,n2)
-#            if n1[0]=='e':
-#                G1p.add_edge(n1,n2)
-#            else:
-#                G1p.add_edge(n2,n1)
-
         scc = list(nx.strongly_connected_components(Gp))
-    #    pos=nx.spring_layout(G1p)
-    #    plt.figure()
-    #    nx.draw(G1p,pos)
-    #    nx.draw_networkx_labels(G1p,pos)
-#        print(scc)
         if scc != []:
             C = nx.condensation(Gp, scc)
-            isc_vars = []
-            for isc, sc in enumerate(scc):
-                for var in variables_to_solve:
-                    if var in sc:
-                        isc_vars.append(isc)
-                        break
-            ancestors_vars = isc_vars[:]
-
-            for isc_var in isc_vars:
-                for ancetre in nx.ancestors(C, isc_var):
-                    if ancetre not in ancestors_vars:
-                        ancestors_vars.append(ancetre)
+            isc_vars = [C.graph['mapping'][variables_indices[var]]
+                        for var in variables_to_solve if var in variables_indices]
+            ancestors_vars = _Reachable(C.reverse(copy=False), isc_vars)
 
             order_sc = [sc for sc in nx.topological_sort(
                 C) if sc in ancestors_vars]
             order_ev = []
             for isc in order_sc:
                 # liste d'équations et de variables triées pour être séparées
-                evs = list(scc[isc])
-#                print(evs)
-#                levs=int(len(evs)/2)
-                eqs = []
-                var = []
-                for element in evs:
-                    if type(element) == tuple:
-                        eqs.append(element)
-                    else:
-                        var.append(element)
+                evs = sorted(scc[isc])
+                eqs = [equations[node-nv] for node in evs if node >= nv]
+                var = [self.variables[node] for node in evs if node < nv]
                 order_ev.append((len(eqs), eqs, var))
 
             return order_ev
 
         raise ModelError
 
-    def Simulate(self, variables_to_solve=None):
+    def _AllocateValues(self, n, ensemble_size):
+        """
+        Allocates the values of variables and signals on n iterations in a
+        single contiguous array, one row per variable
+        """
+        return np.empty((len(self.variables)+len(self.signals),)
+                        + _StorageShape(n, ensemble_size))
+
+    def _RestoreValues(self):
+        """
+        Rebuilds the values array of a loaded model from the values of its
+        variables, which are saved separately. Values stored with different
+        dtypes, or not all recorded on every step, are not gathered
+        """
+        rows = [variable._values for variable in self.variables+self.signals]
+        if (len({(row.dtype, row.shape) for row in rows}) == 1
+                and len(rows[0]) == self.ns+self.max_order+1):
+            self._values = np.array(rows)
+            self._BindStore()
+
+    def _get_values(self):
+        if self._values is None:
+            if not self.variables or len(self.variables[0]._values) == 0:
+                # Not simulated, or first variable not recorded
+                return None
+            self._RestoreValues()
+            if self._values is None:
+                values = [variable._values[variable.max_order:] for variable in self.variables]
+                if len({variable_values.shape for variable_values in values}) > 1:
+                    # Variables recorded with different decimations
+                    return None
+                return np.array(values)
+        return self._values[:len(self.variables), self.max_order:]
+
+    values = property(_get_values, doc="""
+        Values of all variables, in the order of variables attribute: array
+        of shape (number of variables, ns+1), or (number of variables, ns+1,
+        ensemble_size) for ensembles. Values of each variable are a view on
+        a row of this array, so it can be exported without copy, unless
+        variables are stored with different dtypes: values are then a copy.
+        None if the model is not simulated, or if its variables are not all
+        recorded with the same decimation (see Simulate).
+        """)
+
+    def _BindStore(self):
+        """
+        Gives each variable the row of its values in the values array, as
+        index in the store of rows, and binds every block once to the rows of
+        its inputs and outputs, so that the time loop does not allocate or
+        copy values at each step.
+        """
+        variables = self.variables+self.signals
+        self._variables_indices = {variable: i for i, variable in enumerate(variables)}
+        self._store = list(self._values)
+        for variable, row in zip(variables, self._store):
+            variable._values = row
+
+        for block in self.blocks:
+            block._Bind(self._store,
+                        [self._variables_indices[v] for v in block.inputs],
+                        [self._variables_indices[v] for v in block.outputs],
+                        self._values)
+
+    def _StorageDtypes(self, variables, storage_dtype):
+        """
+        Storage dtypes of variables, defaulting to the one of the model
+        """
+        dtypes = []
+        for variable in variables:
+            dtype = getattr(variable, 'storage_dtype', None)
+            dtype = np.dtype(storage_dtype if dtype is None else dtype)
+            if not np.issubdtype(dtype, np.floating):
+                # Unknown values are nan
+                raise TypeError('Values of {} cannot be stored as {}: dtype must be floating point'
+                                .format(variable.name, dtype))
+            dtypes.append(dtype)
+        return dtypes
+
+    def _Decimations(self, variables_to_record, decimation):
+        """
+        Decimation factors of the values of variables then signals, None for
+        the ones not recorded
+        """
+        variables = self.variables+self.signals
+        if variables_to_record is None:
+            decimations = [decimation]*len(variables)
+        else:
+            if not isinstance(variables_to_record, dict):
+                variables_to_record = dict.fromkeys(variables_to_record, decimation)
+            indices = {variable: i for i, variable in enumerate(variables)}
+            decimations = [None]*len(variables)
+            for variable, variable_decimation in variables_to_record.items():
+                if variable not in indices:
+                    raise ValueError('{} is not a variable of the model'.format(variable.name))
+                decimations[indices[variable]] = variable_decimation
+        for variable_decimation in decimations:
+            if variable_decimation is not None and (int(variable_decimation) != variable_decimation
+                                                    or variable_decimation < 1):
+                raise ValueError('Decimation factors must be positive integers')
+        return [None if variable_decimation is None else int(variable_decimation)
+                for variable_decimation in decimations]
+
+    def _AllocateRecords(self, dtypes, decimations, ensemble_size, fill_value=None):
+        """
+        Allocates arrays of the values of recorded variables and signals, one
+        per storage dtype and decimation factor. Values of each step are
+        recorded on all iterations, including the ones before time 0, and
+        decimated values every decimation steps from time 0
+
+        :returns: a list of tuples (indices, rows, decimation, record):
+                  indices of the variables in variables+signals, index of
+                  their rows in the values buffer, decimation factor and
+                  array of their values
+        """
+        groups = {}
+        for i, (dtype, decimation) in enumerate(zip(dtypes, decimations)):
+            if decimation is not None:
+                groups.setdefault((dtype, decimation), []).append(i)
+        records = []
+        for (dtype, decimation), indices in groups.items():
+            if decimation == 1:
+                n = self.ns+self.max_order+1
+            else:
+                n = self.ns//decimation+1
+            record = np.empty((len(indices),)+_StorageShape(n, ensemble_size), dtype)
+            if fill_value is not None:
+                record[:] = fill_value
+            records.append((indices, _RowsIndex(indices), decimation, record))
+        return records
+
+    def _Record(self, records, first, last, step_offset):
+        """
+        Copies iterations first to last (excluded) of the values buffer to
+        records, whose iterations start with the simulation
+        """
+        offset = step_offset+self.max_order
+        for indices, rows, decimation, record in records:
+            if decimation == 1:
+                record[:, first+offset:last+offset] = self._values[rows, first:last]
+            else:
+                # First step of the chunk multiple of decimation
+                step = -(-max(first+step_offset, 0)//decimation)*decimation
+                it = step-step_offset
+                values = self._values[rows, it:last:decimation]
+                record[:, step//decimation:step//decimation+values.shape[1]] = values
+
+    def _BindRecords(self, records):
+        """
+        Gives each variable its recorded values at the end of a simulation,
+        and no values to the variables not recorded
+        """
+        variables = self.variables+self.signals
+        if len(records) == 1 and records[0][2] == 1 and len(records[0][0]) == len(variables):
+            # All values recorded with a single storage dtype: the record
+            # replaces the values buffer
+            self._values = records[0][3]
+            self._BindStore()
+            return
+        self._decimations = dict.fromkeys(variables)
+        for variable in variables:
+            variable._values = _NO_VALUES
+            variable.max_order = 0
+        for indices, rows, decimation, record in records:
+            for i, values in zip(indices, record):
+                variables[i]._values = values
+                self._decimations[variables[i]] = decimation
+                if decimation == 1:
+                    variables[i].max_order = self.max_order
+        self._values = None
+        # Blocks no longer read the values buffer, which is reused or freed
+        store = [variable._values for variable in variables]
+        indices = {variable: i for i, variable in enumerate(variables)}
+        for block in self.blocks:
+            block._Bind(store, [indices[v] for v in block.inputs],
+                        [indices[v] for v in block.outputs])
+
+    def VariableTimes(self, variable):
+        """
+        Times of the values of a variable after a simulation: t, or times of
+        the recorded steps if the variable is recorded with a decimation (see
+        Simulate). Empty if it is not recorded
+        """
+        if self._decimations is None:
+            return self.t
+        decimation = self._decimations[variable]
+        if decimation is None:
+            return self.t[:0]
+        return self.t[::decimation]
+
+    def _Compile(self, order, loop_solver='newton'):
+        """
+        Turns the resolution order into a flat execution plan on the value store.
+        Solvers of algebraic loops are stored in algebraic_loops attribute.
+
+        :returns: a list of tuples (evaluate, output_rows): evaluate(it, ts)
+                  returns the values to write at iteration it in output_rows
+        """
+        plan = []
+        self.algebraic_loops = []
+        for neqs, equations, variables in order:
+            if neqs == 1:
+                block = equations[0][0]
+                if self.ensemble_size is None:
+                    evaluate = block.StepOutputs
+                else:
+                    evaluate = block.EnsembleStepOutputs
+                if self.profile is not None:
+                    evaluate = self.profile.Timed(block, evaluate)
+                plan.append((evaluate, block._output_rows))
+            else:
+                loop = self._AlgebraicLoop(equations, loop_solver)
+                loop._InitStatistics(self.ns, self.max_order)
+                self.algebraic_loops.append(loop)
+                solve = loop.Solve
+                if self.profile is not None:
+                    loop._evaluates = [(self.profile.Timed(block, evaluate), iov)
+                                       for (block, iov), (evaluate, iov) in zip(equations, loop._evaluates)]
+                    solve = self.profile.Timed(loop, loop.Solve)
+                if self.trace is not None:
+                    solve = self.trace.Timed(_ItemName(loop), 'loop', solve)
+                plan.append((solve, loop.rows))
+        return plan
+
+    def _AlgebraicLoop(self, equations, loop_solver):
+        """
+        Returns the solver of the equations of a strongly connected component:
+        a direct linear solve if all its blocks are linear, the solver
+        specified by loop_solver otherwise
+        """
+        if all(len(block.outputs) == 1 and block.LinearCoefficients(self.ts) is not None
+               and _ConstantCoefficients(block.LinearCoefficients(self.ts))
+               for block, iov in equations):
+            try:
+                return LinearAlgebraicLoop(equations, self.ts, self.ensemble_size)
+            except np.linalg.LinAlgError:
+                pass
+        if loop_solver == 'newton':
+            if self.ensemble_size is None:
+                return NewtonAlgebraicLoop(equations)
+            return EnsembleNewtonAlgebraicLoop(equations, self.ensemble_size)
+        elif loop_solver == 'fsolve':
+            return AlgebraicLoop(equations, self.ensemble_size)
+        raise ValueError('Unknown loop solver: '+str(loop_solver))
+
+    def _SolveFeedForward(self, order, it_start, it_end):
+        """
+        Computes at once the whole trajectory of the blocks that depend only
+        on signals or on other feed-forward blocks, when their class provides
+        TrajectoryOutputs.
+
+        :returns: the remaining sequential part of the resolution order
+        """
+        ready = set(self.signals)
+        sequential_order = []
+        for neqs, equations, variables in order:
+            if neqs == 1:
+                block = equations[0][0]
+                if all(variable in ready for variable in block.inputs):
+                    trajectory_outputs = block.TrajectoryOutputs
+                    if self.profile is not None:
+                        trajectory_outputs = self.profile.Timed(block, trajectory_outputs)
+                    trajectories = trajectory_outputs(it_start, it_end, self.ts)
+                    if trajectories is not None:
+                        for row, trajectory in zip(block._output_rows, trajectories):
+                            row[it_start:it_end] = trajectory
+                        ready.update(block.outputs)
+                        continue
+            sequential_order.append((neqs, equations, variables))
+        return sequential_order
+
+    def _LinearSystem(self, order):
+        """
+        Assembles the blocks of the resolution order in a single linear
+        recurrence if they are all linear with constant coefficients.
+
+        :returns: a LinearSystem or None if the model is not linear
+        """
+        blocks = []
+        for neqs, equations, variables in order:
+            for block, iov in equations:
+                if (len(block.outputs) != 1
+                        or block.LinearCoefficients(self.ts) is None
+                        or not _ConstantCoefficients(block.LinearCoefficients(self.ts))):
+                    return None
+                blocks.append(block)
+        if not blocks:
+            return None
+        try:
+            return LinearSystem(blocks, self._store, self._variables_indices, self.ts)
+        except np.linalg.LinAlgError:
+            # Ill-posed algebraic loop: left to the generic solver
+            return None
+
+    def _Span(self, name, category, **args):
+        """
+        Span of the trace of the simulation if it is recorded
+        """
+        if self.trace is None:
+            return nullcontext()
+        return self.trace.Span(name, category, **args)
+
+    def Simulate(self, variables_to_solve=None, options=None, checkpoint_file=None,
+                 checkpoint_interval=10000, restart=False, profile=False, trace_file=None,
+                 variables_to_record=None, decimation=1, **simulation_options):
+        """
+        Simulates the model
+
+        Example::
+
+            ds.Simulate(loop_solver='fsolve', storage_dtype='float32')
+
+        :param variables_to_solve: variables to compute, defaults to the non hidden ones
+        :param options: SimulationOptions of the execution: linear fast path,
+                        vectorized feed-forward blocks, solver of algebraic
+                        loops, ensemble size and storage dtype. Defaults to
+                        the default SimulationOptions
+        :param simulation_options: options of SimulationOptions given as
+                                   keywords, replacing the ones of options
+        :param checkpoint_file: if given, the state of the simulation is
+                                written in this file (numpy .npz format) every
+                                checkpoint_interval steps
+        :param checkpoint_interval: number of steps between checkpoints
+        :param restart: if True and checkpoint_file exists, the simulation
+                        restarts from it with the same results. Values before
+                        the checkpoint are then unknown (nan)
+        :param profile: if True, time and calls of blocks and loops are
+                        recorded in profile attribute (a SimulationProfile)
+        :param trace_file: if given, the timeline of the simulation is written
+                           in this file in Chrome trace event format (JSON),
+                           see SimulationTrace. Each solve of an algebraic
+                           loop is a span: files are large for long
+                           simulations of models with loops
+        :param variables_to_record: variables and signals whose values are
+                                    kept, as a list or as a dict of their
+                                    decimation factors. Defaults to all of
+                                    them. Other ones only keep the past
+                                    values read by blocks during the
+                                    simulation, and have no values after it
+        :param decimation: decimation factor of recorded variables: their
+                           values are kept every decimation steps from time
+                           0, at times given by VariableTimes. As with
+                           storage dtypes, values are computed in a buffer
+                           when variables are selected or decimated
+        """
+        options = self._SimulationOptions(options, simulation_options)
+        buffer_length = self.ns+self.max_order+1
+        history = self._BufferHistory()
+        steps = None
+        restart_file = None
+        if checkpoint_file is not None:
+            steps = checkpoint_interval
+            if restart and os.path.exists(checkpoint_file):
+                restart_file = checkpoint_file
+        records = None
+        dtypes = self._StorageDtypes(self.variables+self.signals, options.storage_dtype)
+        decimations = self._Decimations(variables_to_record, decimation)
+        if any(dtype != np.float64 for dtype in dtypes) or any(variable_decimation != 1
+                                                               for variable_decimation in decimations):
+            buffer_length = min(history+_STORAGE_CHUNK_SIZE, buffer_length)
+            # Values before a checkpoint are unknown
+            records = self._AllocateRecords(dtypes, decimations, options.ensemble_size,
+                                            None if restart_file is None else np.nan)
+        self.profile = None
+        if profile:
+            self.profile = SimulationProfile()
+            start = perf_counter()
+        self.trace = None
+        if trace_file is not None:
+            self.trace = SimulationTrace()
+            gc.callbacks.append(self.trace._GarbageCollection)
+        try:
+            # Values of all steps in a single buffer, unless they are recorded
+            first_chunk = True
+            for first, last, step_offset in self._Chunks(variables_to_solve, buffer_length,
+                                                         options, history, steps, restart_file):
+                if records is not None:
+                    # Initial values of the first chunk are recorded too
+                    self._Record(records, 0 if first_chunk else first, last, step_offset)
+                    first_chunk = False
+                if checkpoint_file is not None and last+step_offset <= self.ns:
+                    with self._Span('checkpoint write', 'io'):
+                        self._WriteCheckpoint(checkpoint_file, last, history, step_offset)
+        finally:
+            if self.trace is not None:
+                gc.callbacks.remove(self.trace._GarbageCollection)
+                self.trace.Write(trace_file)
+        if records is not None:
+            self._BindRecords(records)
+            self._resume_options = None
+        if profile:
+            self.profile.time = perf_counter()-start
+
+    def _SimulationOptions(self, options, simulation_options):
+        """
+        Options of a simulation: given options, or the default ones, with
+        options given as keywords replaced
+        """
+        if options is None:
+            options = SimulationOptions()
+        elif not isinstance(options, SimulationOptions):
+            raise TypeError('options must be SimulationOptions, not {}'.format(type(options).__name__))
+        return options.Replace(**simulation_options)
+
+    def _HistoryLength(self):
+        """
+        Number of past iterations read by the blocks of the model
+        """
+        return max([self.max_order]+[block.HistoryLength(self.ts) for block in self.blocks])
+
+    def _BufferHistory(self):
+        """
+        Number of past iterations kept at the beginning of values buffers and
+        in checkpoints: the ones read by blocks, and at least the 3 read by
+        predictors of loop solvers
+        """
+        return max(self._HistoryLength(), 3)
+
+    def _LoopKey(self, loop):
+        return 'loop_'+'_'.join(str(self._variables_indices[variable])
+                                for variable in loop.variables)
+
+    def _WriteCheckpoint(self, checkpoint_file, it, kept, step_offset):
+        """
+        Writes the state of the simulation before iteration it of the values
+        buffer: kept last values of variables and states of loop solvers.
+        Iterations are saved from the start of the simulation, whatever the
+        buffer. The previous checkpoint is replaced only once the new one is
+        complete.
+        """
+        first = max(it-kept, 0)
+        offset = step_offset+self.max_order
+        arrays = {'it': np.array(it+offset), 'first': np.array(first+offset),
+                  'ns': np.array(self.ns), 'ts': np.array(self.ts),
+                  'names': np.array([variable.name for variable in self.variables]),
+                  'values': self._values[:len(self.variables), first:it]}
+        for loop in self.algebraic_loops:
+            key = self._LoopKey(loop)
+            for name, value in loop._SolverState().items():
+                arrays[key+'-'+name] = value
+        temporary_file = checkpoint_file+'.tmp'
+        with open(temporary_file, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_file, checkpoint_file)
+
+    def _ReadCheckpoint(self, checkpoint_file, buffer_length, history):
+        """
+        Writes the values of a checkpoint in variables, whose previous values
+        are unknown (nan). When the checkpoint is beyond the values buffer,
+        its values become the history of the buffer, which is shifted.
+
+        :returns: the iteration of the buffer to restart from, the shift of
+                  the buffer in iterations and the states of loop solvers by
+                  loop key
+        """
+        with np.load(checkpoint_file) as checkpoint:
+            values = checkpoint['values']
+            if (checkpoint['ns'] != self.ns or checkpoint['ts'] != self.ts
+                    or list(checkpoint['names']) != [variable.name for variable in self.variables]
+                    or values.shape[2:] != self._values.shape[2:]):
+                raise ModelError('Checkpoint '+checkpoint_file+' does not match the model')
+            it = int(checkpoint['it'])
+            first = int(checkpoint['first'])
+            shift = 0
+            if it >= buffer_length:
+                shift = it-history
+                values = values[:, max(shift-first, 0):]
+                first = max(first, shift)
+            self._values[:len(self.variables), :first-shift] = np.nan
+            self._values[:len(self.variables), first-shift:it-shift] = values
+            loop_states = {}
+            for key in checkpoint.files:
+                if key.startswith('loop_'):
+                    loop_key, name = key.split('-')
+                    loop_states.setdefault(loop_key, {})[name] = checkpoint[key]
+        return it-shift, shift, loop_states
+
+    def SimulateChunks(self, variables_to_record, chunk_size=10000,
+                       variables_to_solve=None, options=None, **simulation_options):
+        """
+        Simulates the model in bounded memory: variables only keep the values
+        of the past steps needed by blocks and of the current chunk of steps.
+        Values of variables attribute are thus not available after the
+        simulation.
+
+        Example::
+
+            for t, (speed, torque) in ds.SimulateChunks([speed, torque]):
+                ...
+
+        :param variables_to_record: variables whose values are yielded
+        :param chunk_size: number of steps per chunk
+        :param variables_to_solve: variables to compute, defaults to the non hidden ones
+        :param options: SimulationOptions of the execution, as in Simulate.
+                        With an ensemble size, values are of shape
+                        (ensemble_size, steps of chunk). Values yielded are
+                        in the storage dtype
+        :param simulation_options: options of SimulationOptions given as
+                                   keywords, replacing the ones of options
+
+        :returns: a generator of tuples (t, values): times of the steps of the
+                  chunk and list of values of variables_to_record on these steps
+        """
+        options = self._SimulationOptions(options, simulation_options)
+        self.profile = None
+        self.trace = None
+        dtypes = self._StorageDtypes(variables_to_record, options.storage_dtype)
+        history = self._BufferHistory()
+        buffer_length = min(history+chunk_size, self.ns+self.max_order+1)
+        for first, last, step_offset in self._Chunks(variables_to_solve, buffer_length,
+                                                     options, history):
+            t = self.ts*np.arange(first+step_offset, last+step_offset)
+            yield t, [variable._values[first:last].T.astype(dtype)
+                      for variable, dtype in zip(variables_to_record, dtypes)]
+
+    def _Chunks(self, variables_to_solve, buffer_length, options, history=None,
+                steps=None, restart_file=None):
+        """
+        Simulates the model with values stored in buffers of buffer_length
+        iterations. When a buffer is full, its last history iterations are
+        moved to its beginning and the simulation goes on. Chunks stop at
+        buffer ends, and every given number of steps.
+
+        :returns: a generator of tuples (first, last, step_offset): iterations
+                  first to last (excluded) of the buffers have been computed,
+                  iteration it being time step it+step_offset
+        """
         if variables_to_solve == None:
             variables_to_solve = [
                 variable for variable in self.variables if not variable.hidden]
 
-        order = self._ResolutionOrder(variables_to_solve)
+        with self._Span('resolution order', 'graph'):
+            order = self._ResolutionOrder(variables_to_solve)
 
         # Initialisation of variables values
-        for variable in self.variables+self.signals:
-            variable._InitValues(self.ns, self.ts, self.max_order)
-
-# ==============================================================================
-#         Enhancement to do: defining functions out of loop (copy args)s
-# ==============================================================================
-#        print(order)
-        residue = []
-        for it, t in enumerate(self.t[1:]):
-            for neqs, equations, variables in order:
-                if neqs == 1:
-                    equations[0][0].Solve(it+self.max_order+1, self.ts)
-                else:
-                    #                    x0=np.zeros(neqs)
-                    x0 = [equations[i][0].outputs[equations[i][1]]._values[it +
-                                                                           self.max_order] for i in range(len(equations))]
-#                    print('===========')
-
-                    def r(x, equations=equations[:]):
-                        # Writing variables values proposed by optimizer
-                        for i, xi in enumerate(x):
-                            equations[i][0].outputs[equations[i][1]
-                                                    ]._values[it+self.max_order+1] = xi
-
-                        # Computing regrets
-                        r = []
-#                        s=0
-                        for ieq, (block, neq) in enumerate(equations):
-                            #                            print(block,it)
-                            #                            print(block.Evaluate(it+self.max_order+1,self.ts).shape)
-                            #                            print(block.Evaluate(it+self.max_order+1,self.ts),block)
-                            r.append(x[ieq]-block.Evaluate(it +
-                                                           self.max_order+1, self.ts)[neq])
-#                            print(block)
-#                            print('xproposed:',x[ieq])
-#                            print('block eval',block.Evaluate(it+self.max_order+1,self.ts)[neq])
-#                            print('value', x[ieq]-block.Evaluate(it+self.max_order+1,self.ts)[neq])
-#                            s+=abs(x[ieq]-block.Evaluate(it+self.max_order+1,self.ts)[neq])
-#                            print(x[ieq],block.Evaluate(it+self.max_order+1,self.ts)[neq])
-                        return r
-
-                    def f(x, equations=equations[:]):
-                        # Writing variables values proposed by optimizer
-                        for i, xi in enumerate(x):
-                            equations[i][0].outputs[equations[i][1]
-                                                    ]._values[it+self.max_order+1] = xi
-
-                        # Computing regrets
-#                        r=[]
-                        s = 0
-                        for ieq, (block, neq) in enumerate(equations):
-                            #                            print(block,it)
-                            #                            print(block.Evaluate(it+self.max_order+1,self.ts).shape)
-                            #                            print(block.Evaluate(it+self.max_order+1,self.ts),block)
-                            #                            r.append(x[ieq]-block.Evaluate(it+self.max_order+1,self.ts)[neq])
-                            #                            print(block)
-                            s += abs(x[ieq]-block.Evaluate(it +
-                                                           self.max_order+1, self.ts)[neq])
-#                            print(x[ieq],block.Evaluate(it+self.max_order+1,self.ts)[neq])
-#                        return r
-#                        print(s)
-                        return s
-
-                    x, d, i, m = fsolve(r, x0, full_output=True)
-#                    res=root(f,x0,method='anderson')
-#                    x=res.x
-
-
-#                    res=minimize(f,x0,method='powell')
-#                    if res.fun>1e-3:
-#                        x0=[equations[i][0].outputs[equations[i][1]]._values[it+self.max_order] for i in range(len(equations))]
-#                        x0+=np.random.random(len(equations))
-#                        print('restart')
-#                        res=minimize(f,x0,method='powell')
-#
-#                    residue.append(f(res.x))
-
-
-#                    print(r(x),i)
-#                    print(f(res.x),res.fun)
-#                    f(x)
-#                    print(r)
-#                    if i!=1:
-#                        print(equations)
-#                        print(i,r(x))
-#                        options={'tolfun':1e-3,'verbose':-9,'ftarget':1e-3}
-#                        res=cma.fmin(f,x0,1,options=options)
-#                        print(f(res[0]),r(res[0]))
-# print(equations)
-#
-# print(m)
-# if res.fun>1e-3:
-# print('fail',res.fun)
-# options={'tolfun':1e-3,'verbose':-9}
-# res=cma.fmin(f,x0,1,options=options)
-# else:
-# print('ok')
-#        return residue
+        self.simulation_options = options
+        ensemble_size = self.ensemble_size = options.ensemble_size
+        self._decimations = None
+        with self._Span('variables initialization', 'initialization'):
+            self._values = self._AllocateValues(buffer_length, ensemble_size)
+            rows = iter(self._values)
+            for variable, row in zip(self.variables, rows):
+                variable._InitValues(buffer_length-self.max_order-1, self.ts,
+                                     self.max_order, ensemble_size, row)
+        with self._Span('signals evaluation', 'signals'):
+            for signal, row in zip(self.signals, rows):
+                signal._InitValues(buffer_length-self.max_order-1, self.ts,
+                                   self.max_order, ensemble_size, row)
+        self._BindStore()
+        if buffer_length == self.ns+self.max_order+1:
+            # All values are kept: the simulation can be resumed
+            self._resume_options = (order, options)
+        else:
+            self._resume_options = None
+
+        it_start = self.max_order+1
+        step_offset = -self.max_order
+        loop_states = {}
+        if restart_file is not None:
+            with self._Span('checkpoint read', 'io'):
+                it_start, shift, loop_states = self._ReadCheckpoint(restart_file, buffer_length,
+                                                                    history)
+            if shift:
+                step_offset += shift
+                for signal in self.signals:
+                    signal._FillValues(0, step_offset, self.ts)
+
+        return self._Advance(order, it_start, buffer_length, history, options,
+                             steps, loop_states, step_offset)
+
+    def _Advance(self, order, it_start, buffer_length, history, options, steps=None,
+                 loop_states=None, step_offset=None, previous_loops=None):
+        """
+        Simulates from iteration it_start on values already initialized,
+        see _Chunks
+
+        :param previous_loops: algebraic loops of a previous simulation of
+                               the same values by loop key, continued from
+                               iteration it_start
+        """
+        if loop_states is None:
+            loop_states = {}
+        if previous_loops is None:
+            previous_loops = {}
+        if step_offset is None:
+            step_offset = -self.max_order
+        first = it_start-1
+        linear_system = None
+        plan = None
+        while True:
+            it_end = min(buffer_length, self.ns+1-step_offset)
+            if steps is not None:
+                it_end = min(it_end, it_start+steps)
+            with self._Span('chunk', 'simulation', first_step=it_start+step_offset,
+                            last_step=it_end+step_offset-1):
+                sequential_order = order
+                if options.vectorize_feed_forward:
+                    with self._Span('feed-forward', 'simulation'):
+                        sequential_order = self._SolveFeedForward(order, it_start, it_end)
+                if plan is None:
+                    with self._Span('compilation', 'simulation'):
+                        if options.linear_fast_path:
+                            linear_system = self._LinearSystem(sequential_order)
+                        plan = []
+                        if linear_system is None and sequential_order:
+                            plan = self._Compile(sequential_order, options.loop_solver)
+                            for loop in self.algebraic_loops:
+                                key = self._LoopKey(loop)
+                                if self._resume_options is not None:
+                                    loop._KeepSolverStates()
+                                if key in loop_states:
+                                    loop._SetSolverState(loop_states[key])
+                                if key in previous_loops:
+                                    loop._Continue(previous_loops[key], it_start, self.ts)
+                for loop in self.algebraic_loops:
+                    loop._ShiftStatistics(step_offset+self.max_order)
+
+                if linear_system is not None:
+                    if self.profile is not None:
+                        self.profile.Timed(linear_system, linear_system.Simulate)(it_start, it_end)
+                    else:
+                        linear_system.Simulate(it_start, it_end)
+                elif plan:
+                    self._Run(plan, it_start, it_end)
+            yield first, it_end, step_offset
+
+            if it_end+step_offset == self.ns+1:
+                break
+            if it_end < buffer_length:
+                first = it_end
+                it_start = it_end
+                continue
+            # Buffers are full: past values needed by blocks are kept
+            self._values[:, :history] = self._values[:, it_end-history:it_end]
+            step_offset += it_end-history
+            with self._Span('signals evaluation', 'signals'):
+                for signal in self.signals:
+                    signal._FillValues(history, history+step_offset, self.ts)
+            first = history
+            it_start = history
+
+    def Resume(self, te=None, t_start=None):
+        """
+        Continues the last simulation with the same options, reusing the
+        values already computed.
+
+        Example: extending a simulation to 20s, then recomputing it from 12s
+        after a change of an input signal::
+
+            ds.Simulate()
+            ds.Resume(te=20.)
+            signal.amplitude = 2.  # signals parameters of the user
+            ds.Resume(t_start=12.)
+
+        :param te: new time of simulation's end, not lower than the current
+                   one. The time step is kept
+        :param t_start: time from which the simulation is recomputed (rounded
+                        to a time step), defaults to the previous end.
+                        Signals are evaluated again from this time
+
+        Solvers of algebraic loops continue from their state at this time,
+        and their statistics of the previous steps are kept: results are the
+        same as the ones of a single simulation.
+        """
+        if getattr(self, '_resume_options', None) is None:
+            # Never simulated, simulated by chunks or modified since
+            raise ModelError('No complete simulation to resume')
+        order, options = self._resume_options
+        # Traces cover a single call of Simulate
+        self.trace = None
+
+        if t_start is None:
+            i_start = self.ns+1
+        else:
+            i_start = max(int(round(t_start/self.ts)), 1)
+            if i_start > self.ns+1:
+                raise ValueError('t_start is beyond the end of the simulation')
+        if te is not None:
+            ns = int(round(te/self.ts))
+            if ns < self.ns:
+                raise ValueError('Simulation can only be extended')
+            if self._values is None:
+                self._RestoreValues()
+            # Steps to compute are added at the end of values
+            values = self._AllocateValues(ns+self.max_order+1, self.ensemble_size)
+            values[:, :len(self._values[0])] = self._values
+            values[:, len(self._values[0]):] = 0.
+            self._values = values
+            self.ns = ns
+            self.te = ns*self.ts
+            self.t = np.linspace(0, self.te, num=ns+1)
+            self._BindStore()
+        if i_start > self.ns:
+            return
+
+        it_start = i_start+self.max_order
+        for signal in self.signals:
+            signal._FillValues(it_start, i_start, self.ts)
+        previous_loops = {self._LoopKey(loop): loop for loop in self.algebraic_loops}
+        for chunk in self._Advance(order, it_start, self.ns+self.max_order+1, None, options,
+                                   previous_loops=previous_loops):
+            pass
+
+    def _Run(self, plan, it_start, it_end):
+        """
+        Runs the time loop of a compiled plan from iteration it_start to it_end (excluded)
+        """
+        ts = self.ts
+        for it in range(it_start, it_end):
+            for evaluate, rows in plan:
+                for row, value in zip(rows, evaluate(it, ts)):
+                    row[it] = value
 
     def VariablesValues(self, variables, t):
         """
@@ -513,6 +2246,7 @@ class DynamicSystem:
             raise ValueError
 
     def PlotVariables(self, subplots_variables=None):
+        import matplotlib.pyplot as plt
         if subplots_variables == None:
             subplots_variables = [self.signals+self.variables]
             subplots_variables = [
@@ -524,7 +2258,7 @@ class DynamicSystem:
         for isub, subplot in enumerate(subplots_variables):
             legend = []
             for variable in subplot:
-                axs[isub].plot(self.t, variable.values)
+                axs[isub].plot(self.VariableTimes(variable), variable.values.T)
                 legend.append(variable.name)
             axs[isub].legend(legend, loc='best')
             axs[isub].margins(0.08)
@@ -542,19 +2276,29 @@ class DynamicSystem:
             name_file: name of the file without extension.
             The extension .bms is added by function
         """
+        import dill
         with open(name_file+'.bms', 'wb') as file:
             model = dill.dump(self, file)
 
     def __getstate__(self):
         dic = self.__dict__.copy()
+        dic.pop('_resolution_orders', None)
+        # Rows are saved with the variables, the array is rebuilt from them
+        dic['_values'] = None
         return dic
 
     def __setstate__(self, dic):
+        dic.setdefault('_values', None)
+        dic.setdefault('_decimations', None)
+        dic.setdefault('simulation_options', None)
         self.__dict__ = dic
+        self._resolution_orders = {}
+        self._added_variables = set(self.signals+self.variables)
 
 
 def Load(file):
     """ Loads a model from specified file """
+    import dill
     with open(file, 'rb') as file:
         model = dill.load(file)
         return model
@@ -564,6 +2308,9 @@ class PhysicalNode:
     """
     Abstract class
     """
+    __slots__ = ('cl_solves_potential', 'cl_solves_fluxes', 'name',
+                 'potential_variable_name', 'flux_variable_name', 'variable',
+                 '__dict__', '__weakref__')
 
     def __init__(self, cl_solves_potential, cl_solves_fluxes, node_name, potential_variable_name, flux_variable_name):
         self.cl_solves_potential = cl_solves_potential
@@ -573,11 +2320,19 @@ class PhysicalNode:
         self.flux_variable_name = flux_variable_name
         self.variable = Variable(potential_variable_name+' '+node_name)
 
+    def __getstate__(self):
+        return _Attributes(self)
+
+    def __setstate__(self, state):
+        _SetAttributes(self, state)
+
 
 class PhysicalBlock:
     """
     Abstract class to inherit when coding a physical block
     """
+    __slots__ = ('physical_nodes', 'name', 'nodes_with_fluxes', 'occurence_matrix',
+                 'commands', 'variables', '__dict__', '__weakref__')
 
     def __init__(self, physical_nodes, nodes_with_fluxes, occurence_matrix, commands, name):
         self.physical_nodes = physical_nodes
@@ -588,6 +2343,12 @@ class PhysicalBlock:
         self.variables = [Variable(physical_nodes[inode].flux_variable_name+' from ' +
                                    physical_nodes[inode].name+' to '+self.name) for inode in nodes_with_fluxes]
 
+    def __getstate__(self):
+        return _Attributes(self)
+
+    def __setstate__(self, state):
+        _SetAttributes(self, state)
+
 
 class PhysicalSystem:
     """
@@ -601,6 +2362,9 @@ class PhysicalSystem:
         self.physical_nodes = []
         self.variables = []
         self.command_blocks = []
+        # For fast lookups
+        self._added_physical_nodes = set()
+        self._added_variables = set()
         for block in physical_blocks:
             self.AddPhysicalBlock(block)
 
@@ -620,7 +2384,8 @@ class PhysicalSystem:
 
     def _AddPhysicalNode(self, node):
         if isinstance(node, PhysicalNode):
-            if not node in self.physical_nodes:
+            if not node in self._added_physical_nodes:
+                self._added_physical_nodes.add(node)
                 self.physical_nodes.append(node)
         self._utd_ds = False
 
@@ -635,11 +2400,13 @@ class PhysicalSystem:
 
     def _AddVariable(self, variable):
         if isinstance(variable, Variable):
-            if not variable in self.variables:
+            if not variable in self._added_variables:
+                self._added_variables.add(variable)
                 self.variables.append(variable)
         self._utd_ds = False
 
     def GenerateDynamicSystem(self):
+        import networkx as nx
         #        from bms.blocks.continuous import WeightedSum
         G = nx.Graph()
 #        variables={}
@@ -664,6 +2431,12 @@ class PhysicalSystem:
                                 (block, ie), block.physical_nodes[iv//2].variable)
                         else:
                             G.add_edge((block, ie), block.variables[iv//2])
+        # Fluxes brought to each node by blocks, in a single pass on blocks
+        node_fluxes = {node: [] for node in self.physical_nodes}
+        for block in self.physical_blocks:
+            for iflux, inb in enumerate(block.nodes_with_fluxes):
+                node_fluxes[block.physical_nodes[inb]].append(block.variables[iflux])
+
         # Adding equation of physical nodes: conservative law of node from its occurence matrix
         # Restricted to nodes to which are brought fluxes
         for node in self.physical_nodes:
@@ -673,14 +2446,8 @@ class PhysicalSystem:
             if node.cl_solves_fluxes:
                 # Linking fluxes of node
                 G.add_node(node, bipartite=1)
-                for block in self.physical_blocks:
-                    for inb in block.nodes_with_fluxes:
-                        #                    print(block,block.physical_nodes[inb].name)
-                        node_block = block.physical_nodes[inb]
-                        if node == node_block:
-                            G.add_edge(
-                                node, block.variables[block.nodes_with_fluxes.index(inb)])
-    #                        print(node_block,block.variables[inb].name)
+                for flux_variable in node_fluxes[node]:
+                    G.add_edge(node, flux_variable)
 
 #        # Draw graph for debug
 #        pos=nx.spring_layout(G)
@@ -694,25 +2461,44 @@ class PhysicalSystem:
 #        nx.draw_networkx_labels(G,pos,names)
 #        plt.show()
 
+        # Nodes are numbered in the order they were added, so that the matching
+        # does not depend on object hashes. Equations that a block cannot solve
+        # for their matched variable (e.g. an inductor for a voltage) lose this
+        # edge, and equations are matched again
+        nodes = list(G)
+        numbers = {node: i for i, node in enumerate(nodes)}
+        equations = [i for i, node in enumerate(nodes) if not isinstance(node, Variable)]
+        H = nx.Graph()
+        H.add_nodes_from(range(len(nodes)))
+        H.add_edges_from((numbers[node1], numbers[node2]) for node1, node2 in G.edges())
+        partial_systems = {}
+        while True:
+            matching = nx.bipartite.hopcroft_karp_matching(H, equations)
+            unsolvable = []
+            for equation in equations:
+                if equation in matching:
+                    edge = (equation, matching[equation])
+                    if edge not in partial_systems:
+                        partial_systems[edge] = self._PartialDynamicSystem(
+                            nodes[equation], nodes[matching[equation]], node_fluxes)
+                    if partial_systems[edge] is None:
+                        unsolvable.append(edge)
+            if not unsolvable:
+                break
+            H.remove_edges_from(unsolvable)
+
         G2 = nx.DiGraph()
         G2.add_nodes_from(G)
-        eq_out_var = {}
-        for e in nx.bipartite.maximum_matching(G).items():
-            #            print(e[0].__class__.__name__)
-            # eq -> variable
-            if e[0].__class__.__name__ == 'Variable':
-                G2.add_edge(e[1], e[0])
-                eq_out_var[e[1]] = e[0]
-            else:
-                G2.add_edge(e[0], e[1])
-                eq_out_var[e[0]] = e[1]
+        for equation in equations:
+            if equation in matching:
+                # eq -> variable
+                G2.add_edge(nodes[equation], nodes[matching[equation]])
 
         for e in G.edges():
-            if e[0].__class__.__name__ == 'Variable':
+            if isinstance(e[0], Variable):
                 G2.add_edge(e[0], e[1])
             else:
                 G2.add_edge(e[1], e[0])
-#        print('@@@@@@@@@@@@@@@@@@@@@@@@')
 
         sinks = []
         sources = []
@@ -721,7 +2507,6 @@ class PhysicalSystem:
                 sinks.append(node)
             elif G2.in_degree(node) == 0:
                 sources.append(node)
-#        print(sinks,sources)
 
         if sinks != []:
             print(sinks)
@@ -730,40 +2515,28 @@ class PhysicalSystem:
             print(sources)
             raise ModelError
 
-        # Model is solvable: it must say to equations of blocks which is their
-        # output variable
-
-#        print(eq_out_var)
+        # Model is solvable: equations give the blocks computing their output
+        # variable
         model_blocks = []
-        for block_node, variable in eq_out_var.items():
-            #            print(block_node,variable)
-            if type(block_node) == tuple:
-                # Blocks writes an equation
-                model_blocks.extend(
-                    block_node[0].PartialDynamicSystem(block_node[1], variable))
-            else:
-                # Sum of incomming variables at nodes
-                # searching attached nodes
-                variables = []
-                for block in self.physical_blocks:
-                    try:
-                        ibn = block.physical_nodes.index(block_node)
-                        if ibn in block.nodes_with_fluxes:
-                            variable2 = block.variables[ibn]
-                            if variable2 != variable:
-                                variables.append(variable2)
-                    except ValueError:
-                        pass
-
-#                model_blocks.append(WeightedSum(variables,variable,[-1]*len(variables)))
-                model_blocks.extend(
-                    block_node.ConservativeLaw(variables, variable))
-
-                #                model_blocks.append(Gain(v1,variable,-1))
+        for equation in equations:
+            model_blocks.extend(partial_systems[(equation, matching[equation])])
 
         model_blocks.extend(self.command_blocks)
         return DynamicSystem(self.te, self.ns, model_blocks)
 
+    def _PartialDynamicSystem(self, equation, variable, node_fluxes):
+        """
+        Blocks computing variable from an equation: equation of a physical
+        block, given as (block, index of equation), or conservative law of a
+        physical node. None if the block cannot solve its equation for variable
+        """
+        if type(equation) == tuple:
+            return equation[0].PartialDynamicSystem(equation[1], variable)
+        # Sum of incomming variables at nodes
+        variables = [variable2 for variable2 in node_fluxes[equation]
+                     if variable2 != variable]
+        return equation.ConservativeLaw(variables, variable)
+
     def _get_ds(self):
         if not self._utd_ds:
             self._dynamic_system = self.GenerateDynamicSystem()
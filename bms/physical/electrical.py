@@ -10,6 +10,8 @@ from bms.signals.functions import Step
 
 
 class ElectricalNode(PhysicalNode):
+    __slots__ = ()
+
     def __init__(self, name=''):
         PhysicalNode.__init__(self, False, True, name, 'Voltage', 'Intensity')
 
@@ -18,6 +20,8 @@ class ElectricalNode(PhysicalNode):
 
 
 class Ground(PhysicalBlock):
+    __slots__ = ()
+
     def __init__(self, node1, name='Ground'):
         occurence_matrix = np.array([[1, 0]])  # U1=0
         PhysicalBlock.__init__(self, [node1], [], occurence_matrix, [], name)
@@ -34,6 +38,8 @@ class Ground(PhysicalBlock):
 
 
 class Resistor(PhysicalBlock):
+    __slots__ = ('R',)
+
     def __init__(self, node1, node2, R, name='Resistor'):
         # 1st eq: (U1-U2)=R(i1-i2) 2nd: i1=-i2
         occurence_matrix = np.array([[1, 1, 1, 0], [0, 1, 0, 1]])
@@ -75,6 +81,8 @@ class Generator(PhysicalBlock):
     :param voltage_signal: BMS signal to be input function of voltage (Step,Sinus...)
     """
 
+    __slots__ = ('voltage_signal',)
+
     def __init__(self, node1, node2, voltage_signal, name='GeneratorGround'):
         occurence_matrix = np.array([[1, 0, 1, 0]])  # 1st eq: U2=signal, U1=0
         PhysicalBlock.__init__(self, [node1, node2], [
@@ -156,6 +164,8 @@ class Generator(PhysicalBlock):
 
 
 class Capacitor(PhysicalBlock):
+    __slots__ = ('C',)
+
     def __init__(self, node1, node2, C, name='Capacitor'):
         # 1st eq: (U1-U2)=R(i1-i2) 2nd: i1=-i2
         occurence_matrix = np.array([[1, 0, 1, 0], [0, 1, 0, 1]])
@@ -207,6 +217,8 @@ class Capacitor(PhysicalBlock):
 
 
 class Inductor(PhysicalBlock):
+    __slots__ = ('L',)
+
     def __init__(self, node1, node2, L, name='Inductor'):
         # 1st eq: (U1-U2)=Ldi1/dt 2nd: i1=-i2
         occurence_matrix = np.array([[1, 1, 1, 0], [0, 1, 0, 1]])
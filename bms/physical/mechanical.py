@@ -10,6 +10,8 @@ from bms.blocks.nonlinear import Saturation, Sign
 
 
 class RotationalNode(PhysicalNode):
+    __slots__ = ('inertia', 'friction')
+
     def __init__(self, inertia, friction, name=''):
         PhysicalNode.__init__(self, True, True, name,
                               'Rotational speed', 'Torque')
@@ -32,6 +34,8 @@ class RotationalNode(PhysicalNode):
 
 
 class TranslationalNode(PhysicalNode):
+    __slots__ = ('mass', 'SCx', 'friction')
+
     def __init__(self, mass, SCx, friction, name=''):
         PhysicalNode.__init__(self, True, True, name, 'Speed', 'Force')
         self.mass = mass
@@ -58,6 +62,8 @@ class ThermalEngine(PhysicalBlock):
     Simple thermal engine
     """
 
+    __slots__ = ('wmin', 'wmax', 'Tmax', 'fuel_flow_map', 'max_torque', 'throttle')
+
     def __init__(self, node1, wmin, wmax, Tmax_map, fuel_flow_map, name='Thermal engine'):
         occurence_matrix = np.array([[0, 1]])
         command = Variable('Requested engine throttle')
@@ -90,6 +96,8 @@ class Brake(PhysicalBlock):
     Simple brake, must be improved with non linearity of equilibrium
     """
 
+    __slots__ = ('Tmax',)
+
     def __init__(self, node1, Tmax, name='Brake'):
         occurence_matrix = np.array([[0, 1]])
         command = Variable('Brake command')
@@ -112,6 +120,8 @@ class Clutch(PhysicalBlock):
     Simple clutch
     """
 
+    __slots__ = ('Tmax',)
+
     def __init__(self, node1, node2, Tmax, name='Clutch'):
         occurence_matrix = np.array([[0, 1, 0, 0], [0, 1, 0, 1]])
         command = Variable('Clutch command')
@@ -149,6 +159,8 @@ class GearRatio(PhysicalBlock):
         rotational nodes such as gear sets
     """
 
+    __slots__ = ('ratio',)
+
     def __init__(self, node1, node2, ratio, name='Gear ratio'):
         occurence_matrix = np.array([[1, 0, 1, 0], [0, 1, 0, 1]])
         self.ratio = ratio
@@ -182,6 +194,8 @@ class Wheel(PhysicalBlock):
 
     """
 
+    __slots__ = ('wheels_radius',)
+
     def __init__(self, node_rotation, node_translation, wheels_radius, name='Wheel'):
         occurence_matrix = np.array([[1, 0, 1, 0], [0, 1, 0, 1]])
         self.wheels_radius = wheels_radius
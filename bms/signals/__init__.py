@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from bms.signals.functions import *
+from bms.signals.cycles import *
 from bms.signals.wltp import *
+from bms.signals.recorded import *
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Drive cycles: vehicle speed profiles sampled every second
+
+Speeds of all cycles are stored in data/drive_cycles.npz, in m/s rounded to
+0.01 m/s. They are loaded on first use and shared by all the signals of a
+process.
+"""
+
+import os
+import numpy as np
+from bms import Signal
+
+_DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'drive_cycles.npz')
+_cycles_speeds = {}  # Read-only arrays of speeds by cycle name, once loaded
+
+
+def CycleSpeeds(cycle):
+    """
+    Speeds of a drive cycle, one per second, in m/s
+
+    Args:
+        cycle (str): name of the cycle: 'WLTP1', 'WLTP2', 'WLTP3' or 'NEDC'.
+
+    Returns:
+        A read-only array shared by all the signals of this cycle.
+
+    """
+    if not _cycles_speeds:
+        with np.load(_DATA_FILE) as data:
+            for name in data.files:
+                speeds = data[name]
+                speeds.flags.writeable = False
+                _cycles_speeds[name] = speeds
+    return _cycles_speeds[cycle]
+
+
+class DriveCycle(Signal):
+    """Speed of a drive cycle, linearly interpolated between seconds and
+    zero after the end of the cycle.
+    Caution! speed in m/s, not in km/h!
+
+    Subclasses define the name of their cycle in the data file.
+
+    Args:
+        name (str): The name of this signal.
+
+    """
+    cycle = None
+
+    def _get_data(self):
+        return CycleSpeeds(self.cycle)
+
+    data = property(_get_data)
+
+    def function(self, t):
+        return self.Values(t)
+
+    def Values(self, t):
+        speeds = self.data
+        return np.interp(t, np.arange(len(speeds)), speeds, right=0.)
+
+
+class NEDC(DriveCycle):
+    """
+    NEDC cycle: four ECE-15 urban cycles followed by an extra-urban (EUDC)
+    cycle, 1180s
+    Caution! speed in m/s, not in km/h!
+    """
+    cycle = 'NEDC'
@@ -8,6 +8,14 @@ from bms import Signal
 import numpy as np
 
 
+def _Times(t, *parameters):
+    """
+    Times shaped to be broadcast against parameters given as arrays of
+    values, one per member of an ensemble
+    """
+    return t.reshape((-1,)+(1,)*max([np.ndim(parameter) for parameter in parameters]))
+
+
 class Step(Signal):
     """Create a Step with a certain amplitude, time delay and offset.
 
@@ -35,12 +43,19 @@ class Step(Signal):
     def __init__(self, name='Step', amplitude=1, delay=0, offset=0):
         Signal.__init__(self, name)
 
-        def function(t):
-            if t < delay:
-                return offset
-            else:
-                return amplitude + offset
-        self.function = function
+        self.amplitude = amplitude
+        self.delay = delay
+        self.offset = offset
+
+    def function(self, t):
+        if t < self.delay:
+            return self.offset
+        else:
+            return self.amplitude + self.offset
+
+    def Values(self, t):
+        t = _Times(t, self.amplitude, self.delay, self.offset)
+        return np.where(t < self.delay, self.offset, self.amplitude+self.offset)
 
 
 class Ramp(Signal):
@@ -59,12 +74,19 @@ class Ramp(Signal):
     def __init__(self, name='Ramp', amplitude=1, delay=0, offset=0):
         Signal.__init__(self, name)
 
-        def function(t):
-            if t < delay:
-                return offset
-            else:
-                return (t-delay) * amplitude + offset
-        self.function = function
+        self.amplitude = amplitude
+        self.delay = delay
+        self.offset = offset
+
+    def function(self, t):
+        if t < self.delay:
+            return self.offset
+        else:
+            return (t-self.delay) * self.amplitude + self.offset
+
+    def Values(self, t):
+        t = _Times(t, self.amplitude, self.delay, self.offset)
+        return np.where(t < self.delay, self.offset, (t-self.delay) * self.amplitude + self.offset)
 
 unit_ramp = Ramp(amplitude = 1, name='Unit ramp')
 
@@ -83,7 +105,16 @@ class Sinus(Signal):
     """
     def __init__(self, name='Sinus', amplitude=1, w=1, phase=0, offset=0):
         Signal.__init__(self, name)
-        self.function = lambda t: amplitude * np.sin(w * t + phase) + offset
+        self.amplitude = amplitude
+        self.w = w
+        self.phase = phase
+        self.offset = offset
+
+    def function(self, t):
+        return self.amplitude * np.sin(self.w * t + self.phase) + self.offset
+
+    def Values(self, t):
+        return Sinus.function(self, _Times(t, self.amplitude, self.w, self.phase, self.offset))
 
 
 class SignalFunction(Signal):
@@ -92,9 +123,18 @@ class SignalFunction(Signal):
     Args:
         name (str): The name of this signal.
         function: A function that depends on time.
+        vectorized (bool): True if the function can be called with an array
+            of times, to evaluate it over all time steps in one call.
 
     """
 
-    def __init__(self, name, function):
+    def __init__(self, name, function, vectorized=False):
         Signal.__init__(self, name)
         self.function = function
+        self.vectorized = vectorized
+
+    def Values(self, t):
+        if self.vectorized:
+            values = self.function(t)
+            return np.broadcast_to(values, t.shape+np.shape(values)[1:])
+        return Signal.Values(self, t)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Signals read from measured traces stored in files
+"""
+
+import numpy as np
+from bms import Signal
+
+
+class RecordedSignal(Signal):
+    """Signal of a measured trace stored in a file, linearly interpolated at
+    the times of the simulation. Values before the first sample and after
+    the last one are held.
+
+    The file is memory-mapped: only the samples around the simulated times
+    are read, and it is opened again after a model is loaded.
+
+    Files are either .npy files, or raw binary files of records of columns
+    of the same dtype. Their data is either a column of values sampled every
+    sample_time from start_time, or columns including times and values.
+
+    Args:
+        name (str): The name of this signal.
+        file_name (str): Path of the .npy or raw binary file.
+        value_column (int): Column of values for 2D data.
+        time_column (int): Column of times for 2D data. If None, samples are
+            regular and sample_time must be given.
+        sample_time (float): Time between samples of regular data.
+        start_time (float): Time of the first sample of regular data.
+        dtype: dtype of raw binary files.
+        columns (int): Number of columns of the records of raw binary files.
+
+    """
+
+    def __init__(self, name, file_name, value_column=0, time_column=None,
+                 sample_time=None, start_time=0., dtype='float64', columns=1):
+        Signal.__init__(self, name)
+        if time_column is None and sample_time is None:
+            raise ValueError('Times of samples need a time column or a sample time')
+        self.file_name = file_name
+        self.value_column = value_column
+        self.time_column = time_column
+        self.sample_time = sample_time
+        self.start_time = start_time
+        self.dtype = dtype
+        self.columns = columns
+        self._data = None
+
+    def _get_data(self):
+        if self._data is None:
+            if self.file_name.endswith('.npy'):
+                self._data = np.load(self.file_name, mmap_mode='r')
+            else:
+                data = np.memmap(self.file_name, dtype=self.dtype, mode='r')
+                if self.columns > 1:
+                    data = data.reshape((-1, self.columns))
+                self._data = data
+        return self._data
+
+    data = property(_get_data)
+
+    def __getstate__(self):
+        # Memory maps are not saved with models
+        state = Signal.__getstate__(self)
+        state['_data'] = None
+        return state
+
+    def function(self, t):
+        return self.Values(np.array([t], dtype=float))[0]
+
+    def Values(self, t):
+        data = self.data
+        if data.ndim == 1:
+            values = data
+        else:
+            values = data[:, self.value_column]
+        n = len(values)
+        if self.time_column is None:
+            # Interpolation on positions in the regular samples
+            positions = (t-self.start_time)/self.sample_time
+            first = min(max(int(np.floor(positions.min())), 0), n-1)
+            last = min(max(int(np.ceil(positions.max())), 0), n-1)+1
+            return np.interp(positions, np.arange(first, last), values[first:last])
+        times = data[:, self.time_column]
+        # Only the samples around simulated times are read: bounds are
+        # searched in the dtype of times, with a margin for its rounding
+        bounds = np.array([t.min(), t.max()], dtype=times.dtype)
+        first = max(np.searchsorted(times, bounds[0], side='right')-2, 0)
+        last = min(np.searchsorted(times, bounds[1])+1, n-1)+1
+        return np.interp(t, times[first:last], values[first:last])
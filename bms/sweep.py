@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps: simulations of a model for many sets of parameters
+distributed over a pool of processes.
+
+Models are not sent to the workers: each worker builds its model once, from a
+factory or a saved .bms file, and only parameters and the values of the
+requested variables go through the pool.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import Load
+
+# State of a worker process, set once by _InitWorker
+_worker = {}
+
+
+def ParameterSets(parameters):
+    """
+    Expands a grid of parameters into a list of parameter sets
+
+    :param parameters: dict of lists of values (the cartesian product is taken)
+                       or list of dicts
+    :returns: a list of dicts
+    """
+    if isinstance(parameters, dict):
+        names = list(parameters.keys())
+        return [dict(zip(names, values))
+                for values in itertools.product(*[parameters[name] for name in names])]
+    return [dict(parameter_set) for parameter_set in parameters]
+
+
+def _BuildModel(model):
+    if isinstance(model, str):
+        return Load(model)
+    return model()
+
+
+def _InitWorker(model, apply, variables, simulate_kwargs):
+    dynamic_system = _BuildModel(model)
+    by_name = {variable.name: variable
+               for variable in dynamic_system.variables+dynamic_system.signals}
+    try:
+        recorded = [by_name[name] for name in variables]
+    except KeyError as error:
+        raise KeyError('No variable named {} in model'.format(error))
+    _worker['model'] = dynamic_system
+    _worker['apply'] = apply
+    _worker['variables'] = recorded
+    # Other variables are not kept by simulations
+    _worker['simulate_kwargs'] = dict(simulate_kwargs)
+    _worker['simulate_kwargs'].setdefault('variables_to_record', recorded)
+
+
+def _SimulateParameterSet(parameter_set):
+    dynamic_system = _worker['model']
+    _worker['apply'](dynamic_system, **parameter_set)
+    dynamic_system.Simulate(**_worker['simulate_kwargs'])
+    return {variable.name: variable.values.copy() for variable in _worker['variables']}
+
+
+def Sweep(model, parameters, apply, variables, max_workers=None, chunksize=1,
+          simulate_kwargs=None):
+    """
+    Simulates a model for each set of parameters in a pool of processes.
+    Results are yielded in the order of the parameter sets, as soon as they
+    are available.
+
+    Example::
+
+        def Model():
+            ...
+            return bms.DynamicSystem(te, ns, blocks)
+
+        def SetGain(model, k):
+            model.blocks[0].value = k
+
+        for parameter_set, values in Sweep(Model, {'k': [1, 2, 5]}, SetGain, ['y']):
+            print(parameter_set['k'], values['y'][-1])
+
+    :param model: a function without arguments returning a DynamicSystem, or
+                  the path of a model saved with DynamicSystem.Save. It is
+                  built once per worker, so it must be importable by workers
+                  (defined at module level)
+    :param parameters: grid of parameters, see ParameterSets
+    :param apply: function apply(model, **parameter_set) setting the
+                  parameters on the model of a worker before a simulation
+    :param variables: names of the variables whose values are sent back
+    :param max_workers: number of processes, defaults to the number of CPUs
+    :param chunksize: number of parameter sets sent at once to a worker
+    :param simulate_kwargs: keyword arguments of DynamicSystem.Simulate. By
+                            default, workers only record the requested
+                            variables
+    :returns: a generator of tuples (parameter set, dict of values by name)
+    """
+    parameter_sets = ParameterSets(parameters)
+    if simulate_kwargs is None:
+        simulate_kwargs = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_InitWorker,
+                             initargs=(model, apply, list(variables), simulate_kwargs)) as executor:
+        results = executor.map(_SimulateParameterSet, parameter_sets, chunksize=chunksize)
+        for parameter_set, values in zip(parameter_sets, results):
+            yield parameter_set, values
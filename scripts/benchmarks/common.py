@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Tools shared by benchmarks: timings, peak memory, JSON results and their
+comparison between versions
+"""
+
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import traceback
+import tracemalloc
+from os.path import abspath, dirname
+
+import numpy as np
+import scipy
+import networkx as nx
+
+
+def BmsVersion():
+    """
+    Version of the bms package benchmarked: installed version or git description
+    """
+    try:
+        from importlib.metadata import version
+        return version('bms')
+    except Exception:
+        pass
+    try:
+        import bms
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                       cwd=dirname(abspath(bms.__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def Environment():
+    return {'bms': BmsVersion(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'networkx': nx.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def Timing(function, repeat=1):
+    """
+    Best time of function calls in seconds
+    """
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def PeakMemory(function):
+    """
+    Peak of memory allocated by python and numpy during a call of function, in bytes
+    """
+    tracemalloc.start()
+    try:
+        function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def Attempt(description, function):
+    """
+    Calls function and reports its error instead of raising it, so that the
+    other measures are still made: the traceback is printed, and callers
+    write the error in results (see CheckErrors)
+
+    :returns: the result of function and None, or None and the error
+    """
+    try:
+        return function(), None
+    except Exception as error:
+        print('{} failed:'.format(description), file=sys.stderr)
+        traceback.print_exc()
+        return None, error
+
+
+def CheckErrors(results):
+    """
+    Exits with an error status if some results are errors
+    """
+    errors = [result for result in results if 'error' in result]
+    if errors:
+        sys.exit('{} benchmarks failed: {}'.format(
+            len(errors), ', '.join(result['error'] for result in errors)))
+
+
+def WriteResults(file_name, benchmark, results, **summary):
+    """
+    Writes a list of results, and optional summary entries, as JSON
+    """
+    data = {'benchmark': benchmark, 'environment': Environment(), 'results': results}
+    data.update(summary)
+    with open(file_name, 'w') as file:
+        json.dump(data, file, indent=1)
+
+
+def ReadResults(file_name):
+    with open(file_name) as file:
+        return json.load(file)
+
+
+def PrintResults(results, keys, reference=None, measures=None):
+    """
+    Prints results as a table. With reference results, measures are given
+    with their ratio to the reference ones having the same keys
+    """
+    if measures is None:
+        measures = [name for name in results[0] if name not in keys] if results else []
+    references = {}
+    if reference is not None:
+        references = {tuple(result[key] for key in keys): result
+                      for result in reference['results'] if 'error' not in result}
+    widths = [max([len(key)]+[len(str(result[key])) for result in results]) for key in keys]
+    print(' '.join(['{:>{}}'.format(key, width) for key, width in zip(keys, widths)]
+                   + ['{:>14}'.format(name[:14]) for name in measures]))
+    for result in results:
+        line = ['{:>{}}'.format(str(result[key]), width) for key, width in zip(keys, widths)]
+        reference_result = references.get(tuple(result[key] for key in keys))
+        for name in measures:
+            value = result[name]
+            if reference_result is not None and reference_result.get(name):
+                line.append('{:>8.3g} x{:<5.2f}'.format(value, value/reference_result[name]))
+            else:
+                line.append('{:>14.4g}'.format(value))
+        print(' '.join(line))
+    sys.stdout.flush()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the example models of scripts/ at several numbers of steps.
+
+Scripts are run headless until their first simulation: the model is then
+simulated by the benchmark, and plots of the script are not reached.
+Measures: time to build the model (script until simulation, including
+GenerateDynamicSystem for physical systems), time of the resolution order,
+time and peak memory of the simulation.
+
+Usage::
+
+    python scripts/benchmarks/examples.py --ns 1000 10000 --output new.json --compare old.json
+"""
+
+import argparse
+import os
+import time
+from os.path import abspath, dirname, join
+
+import matplotlib
+matplotlib.use('Agg')
+
+import bms
+from common import Attempt, CheckErrors, Timing, PeakMemory, WriteResults, ReadResults, PrintResults
+
+SCRIPTS_DIRECTORY = dirname(dirname(abspath(__file__)))
+SCRIPTS = ['first_order.py', 'second_order.py', 'physical/RLC.py',
+           'physical/vehicle.py', 'clutch.py', 'brake.py', 'electric_motor.py']
+
+
+class _ModelBuilt(Exception):
+    def __init__(self, dynamic_system):
+        self.dynamic_system = dynamic_system
+
+
+def _StopAtSimulation(dynamic_system, *args, **kwargs):
+    raise _ModelBuilt(dynamic_system)
+
+
+def BuildModel(script):
+    """
+    Runs a script until its first simulation
+
+    :returns: the dynamic system to simulate and the time taken to build it
+    """
+    path = join(SCRIPTS_DIRECTORY, script)
+    with open(path) as file:
+        code = compile(file.read(), path, 'exec')
+    simulate = bms.DynamicSystem.Simulate
+    cwd = os.getcwd()
+    bms.DynamicSystem.Simulate = _StopAtSimulation
+    os.chdir(dirname(path))
+    try:
+        start = time.perf_counter()
+        exec(code, {'__name__': '__main__', '__file__': path})
+    except _ModelBuilt as model_built:
+        return model_built.dynamic_system, time.perf_counter()-start
+    finally:
+        bms.DynamicSystem.Simulate = simulate
+        os.chdir(cwd)
+    raise ValueError('Script {} does not simulate a model'.format(script))
+
+
+def SetSteps(dynamic_system, ns):
+    """
+    Changes the number of steps of a model, keeping its end time
+    """
+    dynamic_system.ns = ns
+    dynamic_system.ts = dynamic_system.te/float(ns)
+    dynamic_system.t = bms.np.linspace(0, dynamic_system.te, num=ns+1)
+
+
+def BenchmarkScript(script, ns_list, repeat=1):
+    results = []
+    # First build imports modules used by the script
+    dynamic_system, build_time = BuildModel(script)
+    for i in range(repeat):
+        dynamic_system, time_i = BuildModel(script)
+        build_time = min(build_time, time_i) if i else time_i
+    variables_to_solve = [variable for variable in dynamic_system.variables
+                          if not variable.hidden]
+
+    def ResolutionOrder():
+        dynamic_system._resolution_orders = {}
+        dynamic_system._ResolutionOrder(variables_to_solve)
+
+    # Untimed first simulation: modules imported on first use by bms are not
+    # counted in the times of the first number of steps
+    SetSteps(dynamic_system, min(ns_list))
+    dynamic_system.Simulate()
+    resolution_time = Timing(ResolutionOrder, repeat)
+    for ns in ns_list:
+        SetSteps(dynamic_system, ns)
+        results.append({'script': script, 'ns': ns,
+                        'build_time': build_time,
+                        'resolution_time': resolution_time,
+                        'simulate_time': Timing(dynamic_system.Simulate, repeat),
+                        'peak_memory': PeakMemory(dynamic_system.Simulate)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('scripts', nargs='*', default=SCRIPTS,
+                        help='scripts relative to scripts/ (defaults to the reference models)')
+    parser.add_argument('--ns', type=int, nargs='+', default=[1000, 10000],
+                        help='numbers of steps of simulations')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='number of runs of each measure, the best one is kept')
+    parser.add_argument('--output', help='JSON file of results')
+    parser.add_argument('--compare', help='JSON file of reference results')
+    args = parser.parse_args()
+
+    reference = None
+    if args.compare:
+        reference = ReadResults(args.compare)
+    results = []
+    for script in args.scripts:
+        script_results, error = Attempt(script,
+                                        lambda: BenchmarkScript(script, args.ns, args.repeat))
+        if error is not None:
+            results.append({'script': script, 'error': repr(error)})
+            continue
+        PrintResults(script_results, ['script', 'ns'], reference)
+        results.extend(script_results)
+    if args.output:
+        WriteResults(args.output, 'examples', results)
+    CheckErrors(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Import time benchmark: cost of importing bms in a fresh process.
+
+Each measure runs a new interpreter, which imports modules of bms and
+optionally simulates a small model, with an algebraic loop or with
+feed-forward blocks only. Measures: time of the imports, time to
+the end of a first simulation, peak resident memory of the process and the
+heavy optional dependencies that were imported.
+
+Usage::
+
+    python scripts/benchmarks/imports.py --repeat 5 --output new.json --compare old.json
+"""
+
+import argparse
+import subprocess
+import sys
+from os.path import abspath, dirname
+
+from common import WriteResults, ReadResults, PrintResults
+
+ROOT_DIRECTORY = dirname(dirname(dirname(abspath(__file__))))
+
+CASES = {'bms': 'import bms',
+         'blocks': 'import bms; import bms.blocks',
+         'signals': 'import bms; import bms.signals',
+         'physical': 'import bms.physical.electrical, bms.physical.mechanical',
+         'simulation': 'import bms; import bms.blocks; import bms.signals',
+         'feed_forward': 'import bms; import bms.blocks; import bms.signals'}
+
+# A small model with an algebraic loop, simulated by the simulation case
+SIMULATION = '''
+from bms.signals.functions import Step
+from bms.blocks.continuous import Gain, ODE, Subtraction
+from bms.blocks.nonlinear import Saturation
+r = Step('r', 1.)
+e, u, y = bms.Variable('e'), bms.Variable('u'), bms.Variable('y')
+blocks = [Subtraction(r, y, e), Saturation(e, u, -0.5, 0.5), ODE(u, y, [1], [1, 1])]
+bms.DynamicSystem(5, 500, blocks).Simulate()
+'''
+
+# A small model whose ODE only depends on a signal, evaluated over the whole
+# simulation before the time loop, simulated by the feed_forward case
+FEED_FORWARD = '''
+from bms.signals.functions import Sinus
+from bms.blocks.continuous import Gain, ODE
+u = Sinus('u', 1., 2.)
+y, z = bms.Variable('y'), bms.Variable('z')
+blocks = [ODE(u, y, [1], [1, 0.5, 1]), Gain(y, z, 2.)]
+bms.DynamicSystem(5, 500, blocks).Simulate()
+'''
+
+SIMULATIONS = {'simulation': SIMULATION, 'feed_forward': FEED_FORWARD}
+
+DEPENDENCIES = ['matplotlib', 'networkx', 'dill', 'scipy.optimize',
+                'scipy.linalg', 'scipy.signal']
+
+PROBE = '''
+import sys, time, resource
+start = time.perf_counter()
+{imports}
+import_time = time.perf_counter()-start
+{simulation}
+total_time = time.perf_counter()-start
+print(repr((import_time, total_time,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            [name for name in {dependencies!r} if name in sys.modules])))
+'''
+
+
+def Probe(case):
+    """
+    Runs a case in a new interpreter
+
+    :returns: import time, total time, peak resident memory in bytes and
+              loaded dependencies
+    """
+    code = PROBE.format(imports=CASES[case], dependencies=DEPENDENCIES,
+                        simulation=SIMULATIONS.get(case, ''))
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT_DIRECTORY)
+    import_time, total_time, max_rss, dependencies = eval(output.decode().strip().splitlines()[-1])
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    if sys.platform != 'darwin':
+        max_rss *= 1024
+    return import_time, total_time, max_rss, dependencies
+
+
+def BenchmarkCase(case, repeat=1):
+    measures = [Probe(case) for i in range(repeat)]
+    return {'case': case,
+            'import_time': min(measure[0] for measure in measures),
+            'total_time': min(measure[1] for measure in measures),
+            'peak_rss': min(measure[2] for measure in measures),
+            'dependencies': ' '.join(measures[0][3])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('cases', nargs='*', default=list(CASES.keys()),
+                        help='cases: '+', '.join(CASES.keys()))
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of processes of each case, the best one is kept')
+    parser.add_argument('--output', help='JSON file of results')
+    parser.add_argument('--compare', help='JSON file of reference results')
+    args = parser.parse_args()
+
+    reference = None
+    if args.compare:
+        reference = ReadResults(args.compare)
+    results = [BenchmarkCase(case, args.repeat) for case in args.cases]
+    PrintResults(results, ['case'], reference, ['import_time', 'total_time', 'peak_rss'])
+    print('Dependencies imported:')
+    for result in results:
+        print('  {}: {}'.format(result['case'], result['dependencies'] or '-'))
+    if args.output:
+        WriteResults(args.output, 'imports', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Memory benchmark of the objects of models: blocks and variables.
+
+Models are the synthetic families of scalability.py. For ladder, the
+dynamic system generated from the physical system is measured, with its
+hidden variables and Gain/WeightedSum blocks.
+Measures: memory held by the model once built (traced by tracemalloc, values
+of simulations excluded), the same per block, and the mean shallow size of
+block and variable objects (instance, and attribute dictionary if not
+empty).
+
+Usage::
+
+    python scripts/benchmarks/memory.py --sizes 1000 10000 --output new.json --compare old.json
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+
+import bms
+from scalability import MODELS
+from common import Attempt, CheckErrors, WriteResults, ReadResults, PrintResults
+
+
+def ShallowSize(item):
+    """
+    Size in bytes of an object and of its attribute dictionary
+    """
+    size = sys.getsizeof(item)
+    # Dictionaries of objects with slots are created when accessed: empty
+    # ones are not counted
+    attributes = getattr(item, '__dict__', None)
+    if attributes:
+        size += sys.getsizeof(attributes)
+    return size
+
+
+def BuildDynamicSystem(name, n, ns):
+    model = MODELS[name](n, ns)
+    if isinstance(model, bms.PhysicalSystem):
+        return model.dynamic_system
+    return model
+
+
+def BenchmarkModel(name, n, ns):
+    # First build imports and caches what models need
+    BuildDynamicSystem(name, 2, ns)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        dynamic_system = BuildDynamicSystem(name, n, ns)
+        gc.collect()
+        model_memory = tracemalloc.get_traced_memory()[0]-start
+    finally:
+        tracemalloc.stop()
+    blocks = dynamic_system.blocks
+    variables = dynamic_system.variables
+    return {'model': name, 'size': n,
+            'blocks': len(blocks), 'variables': len(variables),
+            'model_memory': model_memory,
+            'memory_per_block': model_memory/len(blocks),
+            'block_size': float(np.mean([ShallowSize(block) for block in blocks])),
+            'variable_size': float(np.mean([ShallowSize(variable) for variable in variables]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('models', nargs='*', default=list(MODELS.keys()),
+                        help='families of models: '+', '.join(MODELS.keys()))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='sizes of models')
+    parser.add_argument('--ns', type=int, default=100,
+                        help='number of steps of simulations')
+    parser.add_argument('--output', help='JSON file of results')
+    parser.add_argument('--compare', help='JSON file of reference results')
+    args = parser.parse_args()
+
+    reference = None
+    if args.compare:
+        reference = ReadResults(args.compare)
+    results = []
+    for name in args.models:
+        model_results = []
+        for n in args.sizes:
+            result, error = Attempt('{} {}'.format(name, n),
+                                    lambda: BenchmarkModel(name, n, args.ns))
+            if error is None:
+                model_results.append(result)
+            else:
+                results.append({'model': name, 'size': n, 'error': repr(error)})
+        PrintResults(model_results, ['model', 'size'], reference,
+                     ['blocks', 'model_memory', 'memory_per_block',
+                      'block_size', 'variable_size'])
+        results.extend(model_results)
+    if args.output:
+        WriteResults(args.output, 'memory', results)
+    CheckErrors(results)
+
+
+if __name__ == '__main__':
+    main()
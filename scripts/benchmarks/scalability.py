@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Scalability benchmark on synthetic models of growing size.
+
+Families of models:
+
+- chain: n blocks alternating Gain and ODE in series
+- fan_in: n gains summed by a single WeightedSum
+- loop: cascade of n/10 algebraic loops of 10 gains and a saturation, each
+  feeding the next one (condensation of depth n/10)
+- ladder: resistor ladder of n cells modelled with PhysicalSystem
+
+For each size, times of GenerateDynamicSystem (ladder only), of the
+resolution order and of the simulation are measured. Scaling exponents are
+estimated by a log-log fit on sizes.
+
+Usage::
+
+    python scripts/benchmarks/scalability.py --sizes 10 100 1000 --output scalability.json
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import bms
+from bms.signals.functions import Sinus
+from bms.blocks.continuous import Gain, ODE, WeightedSum
+from bms.blocks.nonlinear import Saturation
+from bms.physical.electrical import Generator, Resistor, ElectricalNode, Ground
+from common import Attempt, CheckErrors, Timing, WriteResults, ReadResults, PrintResults
+
+
+def Chain(n, ns):
+    u = Sinus('u', 1., 1.)
+    variables = [u]
+    blocks = []
+    for i in range(n):
+        variable = bms.Variable('x{}'.format(i))
+        if i % 2:
+            blocks.append(ODE(variables[-1], variable, [1], [1, 0.1]))
+        else:
+            blocks.append(Gain(variables[-1], variable, 1.))
+        variables.append(variable)
+    return bms.DynamicSystem(1., ns, blocks)
+
+
+def FanIn(n, ns):
+    u = Sinus('u', 1., 1.)
+    gains = [bms.Variable('x{}'.format(i)) for i in range(n)]
+    blocks = [Gain(u, gain, 1./(i+1)) for i, gain in enumerate(gains)]
+    blocks.append(WeightedSum(gains, bms.Variable('y'), [1.]*n))
+    return bms.DynamicSystem(1., ns, blocks)
+
+
+def Loop(n, ns, loop_size=10):
+    """
+    Cascade of algebraic loops of about loop_size gains and a saturation,
+    each loop feeding the next one: the condensation of the resolution graph
+    is a path of n/loop_size loops
+    """
+    u = Sinus('u', 1., 1.)
+    n_loops = max(n//loop_size, 1)
+    blocks = []
+    loop_input = u
+    for i in range(n_loops):
+        e = bms.Variable('e{}'.format(i))
+        variables = [bms.Variable('x{}_{}'.format(i, j))
+                     for j in range(max(n//n_loops, 1))]
+        blocks.append(WeightedSum([loop_input, variables[-1]], e, [1., -0.5]))
+        blocks.append(Saturation(e, variables[0], -0.8, 0.8))
+        for variable1, variable2 in zip(variables[:-1], variables[1:]):
+            blocks.append(Gain(variable1, variable2, 1.))
+        loop_input = variables[-1]
+    return bms.DynamicSystem(1., ns, blocks)
+
+
+def Ladder(n, ns):
+    """
+    Generator feeding n cells: a series resistor followed by a resistor to ground
+    """
+    u = Sinus('u', 1., 1.)
+    ground = ElectricalNode('ground')
+    nodes = [ElectricalNode(str(i)) for i in range(n+1)]
+    blocks = [Generator(ground, nodes[0], u), Ground(ground)]
+    for node1, node2 in zip(nodes[:-1], nodes[1:]):
+        blocks.append(Resistor(node1, node2, 10.))
+        blocks.append(Resistor(node2, ground, 100.))
+    return bms.PhysicalSystem(1., ns, blocks, [])
+
+
+MODELS = {'chain': Chain, 'fan_in': FanIn, 'loop': Loop, 'ladder': Ladder}
+
+
+def BenchmarkModel(name, n, ns, repeat=1):
+    # Untimed simulation of a small model of the family: modules imported on
+    # first use by bms are not counted in the times of the smallest size
+    model = MODELS[name](2, ns)
+    if isinstance(model, bms.PhysicalSystem):
+        model = model.dynamic_system
+    model.Simulate()
+    start = time.perf_counter()
+    model = MODELS[name](n, ns)
+    build_time = time.perf_counter()-start
+    result = {'model': name, 'size': n, 'ns': ns, 'build_time': build_time}
+    if isinstance(model, bms.PhysicalSystem):
+        result['generate_time'] = Timing(model.GenerateDynamicSystem, repeat)
+        dynamic_system = model.dynamic_system
+    else:
+        dynamic_system = model
+    variables_to_solve = [variable for variable in dynamic_system.variables
+                          if not variable.hidden]
+
+    def ResolutionOrder():
+        dynamic_system._resolution_orders = {}
+        dynamic_system._ResolutionOrder(variables_to_solve)
+
+    result['resolution_time'] = Timing(ResolutionOrder, repeat)
+    result['simulate_time'] = Timing(dynamic_system.Simulate, repeat)
+    result['blocks'] = len(dynamic_system.blocks)
+    return result
+
+
+def ScalingExponents(results, measures):
+    """
+    Exponent a of the fit measure ~ size**a of each model
+    """
+    exponents = {}
+    for name in sorted({result['model'] for result in results}):
+        model_results = [result for result in results
+                         if result['model'] == name and 'error' not in result]
+        if len(model_results) < 2:
+            continue
+        sizes = np.log([result['size'] for result in model_results])
+        for measure in measures:
+            if measure in model_results[0]:
+                values = np.log([max(result[measure], 1e-9) for result in model_results])
+                exponents[name+' '+measure] = np.polyfit(sizes, values, 1)[0]
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('models', nargs='*', default=list(MODELS.keys()),
+                        help='families of models: '+', '.join(MODELS.keys()))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help='sizes of models')
+    parser.add_argument('--ns', type=int, default=100,
+                        help='number of steps of simulations')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='number of runs of each measure, the best one is kept')
+    parser.add_argument('--output', help='JSON file of results')
+    parser.add_argument('--compare', help='JSON file of reference results')
+    args = parser.parse_args()
+
+    reference = None
+    if args.compare:
+        reference = ReadResults(args.compare)
+    results = []
+    for name in args.models:
+        model_results = []
+        for n in args.sizes:
+            result, error = Attempt('{} {}'.format(name, n),
+                                    lambda: BenchmarkModel(name, n, args.ns, args.repeat))
+            if error is None:
+                model_results.append(result)
+            else:
+                results.append({'model': name, 'size': n, 'error': repr(error)})
+        PrintResults(model_results, ['model', 'size'], reference,
+                     [measure for measure in ['build_time', 'generate_time',
+                                              'resolution_time', 'simulate_time']
+                      if model_results and measure in model_results[0]])
+        results.extend(model_results)
+
+    exponents = ScalingExponents(results, ['generate_time', 'resolution_time', 'simulate_time'])
+    print('Scaling exponents (time ~ size**a):')
+    for name, exponent in exponents.items():
+        print('  {}: {:.2f}'.format(name, exponent))
+    if args.output:
+        WriteResults(args.output, 'scalability', results, scaling_exponents=exponents)
+    CheckErrors(results)
+
+
+if __name__ == '__main__':
+    main()
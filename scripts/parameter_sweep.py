@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweep of a first order closed loop over a pool of processes
+"""
+
+import bms
+from bms.signals.functions import Step
+from bms.blocks.continuous import Gain, ODE, Subtraction
+from bms.sweep import Sweep
+
+
+def Model():
+    r = Step('r', 1.)
+    e = bms.Variable('e')
+    u = bms.Variable('u')
+    y = bms.Variable('y')
+    blocks = [Subtraction(r, y, e), Gain(e, u, 1.), ODE(u, y, [1], [0, 1])]
+    return bms.DynamicSystem(5, 5000, blocks)
+
+
+def SetGain(model, k):
+    model.blocks[1].value = k
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    t = np.linspace(0, 5, 5001)
+    plt.figure()
+    for parameter_set, values in Sweep(Model, {'k': [0.5, 1., 2., 5., 10.]},
+                                       SetGain, ['y'], chunksize=2):
+        plt.plot(t, values['y'], label='k={}'.format(parameter_set['k']))
+    plt.legend()
+    plt.show()
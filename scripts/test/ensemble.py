@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Ensemble simulation of a loop whose WeightedSum has an offset per member,
+compared with the simulations of each member
+"""
+
+import numpy as np
+import bms
+from bms.signals.functions import Step
+from bms.blocks.continuous import WeightedSum, ODE
+
+offsets = np.array([0., 1., 2.])
+
+
+def Model(offset):
+    u = Step('u', 1.)
+    e = bms.Variable('e')
+    y = bms.Variable('y')
+    blocks = [WeightedSum([u, y], e, [0.5, -0.5], offset),
+              ODE(e, y, [1], [1, 1])]
+    return bms.DynamicSystem(5, 500, blocks), y
+
+
+ds, y = Model(offsets)
+ds.Simulate(ensemble_size=len(offsets))
+assert np.array_equal(offsets, [0., 1., 2.]), 'Offsets modified by the simulation'
+
+for member, offset in enumerate(offsets):
+    ds_member, y_member = Model(offset)
+    ds_member.Simulate()
+    error = np.max(np.abs(y.values[member]-y_member.values))
+    print('member {}: final value {:.4g}, error {:.3g}'.format(member, y.values[member, -1], error))
+    assert error < 1e-8
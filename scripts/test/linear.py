@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Linear models solved by LinearSystem (linear fast path) and by
+LinearAlgebraicLoop (step-by-step path), compared with the same loop solved
+by fsolve, and sparse factorizations of large models compared with dense ones
+"""
+
+import numpy as np
+import bms
+import bms.core
+from bms.signals.functions import Sinus
+from bms.blocks.continuous import Gain, ODE, WeightedSum, FunctionBlock
+from bms.physical.electrical import Generator, Resistor, Capacitor, ElectricalNode, Ground
+
+
+def LoopModel(linear):
+    u = Sinus('u', 1., 3.)
+    e, z, y = [bms.Variable(name) for name in 'ezy']
+    if linear:
+        gain = Gain(e, z, 0.8)
+    else:
+        # Same gain, solved as a nonlinear block
+        gain = FunctionBlock(e, z, lambda value: 0.8*value)
+    blocks = [WeightedSum([u, z, y], e, [1., -0.5, -1.]), gain,
+              ODE(e, y, [1], [1, 0.2])]
+    return bms.DynamicSystem(5, 500, blocks)
+
+
+def Ladder(n):
+    """
+    Generator feeding n cells: a series resistor and a capacitor to ground
+    """
+    u = Sinus('u', 1., 2.)
+    ground = ElectricalNode('ground')
+    nodes = [ElectricalNode(str(i)) for i in range(n+1)]
+    blocks = [Generator(ground, nodes[0], u), Ground(ground)]
+    for node1, node2 in zip(nodes[:-1], nodes[1:]):
+        blocks.append(Resistor(node1, node2, 10.))
+        blocks.append(Capacitor(node2, ground, 0.01))
+    return bms.PhysicalSystem(2, 200, blocks, []).dynamic_system
+
+
+def Simulate(ds, **kwargs):
+    """
+    Values of the variables of a model and kinds of items of its profile
+    """
+    ds.Simulate(profile=True, **kwargs)
+    return ds.values.copy(), {entry['kind'] for entry in ds.profile.Table()}
+
+
+def LinearItems(ds):
+    return [item for item in ds.profile._records
+            if isinstance(item, (bms.LinearSystem, bms.LinearAlgebraicLoop))]
+
+
+ds = LoopModel(True)
+fast, kinds = Simulate(ds)
+assert 'linear system' in kinds and 'loop' not in kinds
+step, kinds = Simulate(ds, linear_fast_path=False, vectorize_feed_forward=False)
+assert isinstance(ds.algebraic_loops[0], bms.LinearAlgebraicLoop)
+reference, kinds = Simulate(LoopModel(False), loop_solver='fsolve', linear_fast_path=False,
+                            vectorize_feed_forward=False)
+print('loop: linear system error {:.3g}, linear loop error {:.3g}'.format(
+    np.max(np.abs(fast-reference)), np.max(np.abs(step-reference))))
+assert np.max(np.abs(fast-reference)) < 1e-9
+assert np.max(np.abs(step-reference)) < 1e-9
+
+# More unknowns than bms.core._DENSE_SIZE: sparse LU factorizations
+ds = Ladder(150)
+fast, kinds = Simulate(ds)
+linear_system, = LinearItems(ds)
+assert linear_system.sparse
+step, kinds = Simulate(ds, linear_fast_path=False, vectorize_feed_forward=False)
+assert any(loop._splu is not None for loop in ds.algebraic_loops)
+dense_size = bms.core._DENSE_SIZE
+bms.core._DENSE_SIZE = 10**6
+try:
+    dense_fast, kinds = Simulate(ds)
+    assert not LinearItems(ds)[0].sparse
+    dense_step, kinds = Simulate(ds, linear_fast_path=False, vectorize_feed_forward=False)
+    assert all(loop._splu is None for loop in ds.algebraic_loops)
+finally:
+    bms.core._DENSE_SIZE = dense_size
+scale = 1+np.max(np.abs(dense_step))
+print('ladder: sparse linear system error {:.3g}, sparse loop error {:.3g}, '
+      'dense linear system error {:.3g}'.format(np.max(np.abs(fast-dense_step))/scale,
+                                                np.max(np.abs(step-dense_step))/scale,
+                                                np.max(np.abs(dense_fast-dense_step))/scale))
+assert np.max(np.abs(fast-dense_step)) < 1e-9*scale
+assert np.max(np.abs(step-dense_step)) < 1e-9*scale
+assert np.max(np.abs(dense_fast-dense_step)) < 1e-9*scale
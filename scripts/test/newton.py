@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Newton solver of algebraic loops compared with fsolve on the step-by-step
+path: same values on loops having a solution at each step, residuals not
+larger on discontinuous loops (stick-slip of a brake with Coulomb friction)
+"""
+
+import numpy as np
+import bms
+from bms.signals.functions import Step, Sinus
+from bms.blocks.continuous import Gain, ODE, WeightedSum, Product
+from bms.blocks.nonlinear import CoulombVariableValue, Saturation
+
+
+def Brake():
+    command = Sinus('command', 0.5, 0.1, 0, 0.5)
+    input_torque = Step('input torque', 100)
+    resistant_torque = Step('resistant torque', -80)
+    capacity = bms.Variable('torque capacity')
+    brake_torque = bms.Variable('brake torque')
+    speed = bms.Variable('speed')
+    torques = bms.Variable('sum of torques')
+    external_torques = bms.Variable('sum of external torques')
+    blocks = [Gain(command, capacity, 300),
+              WeightedSum([input_torque, resistant_torque], external_torques, [1, 1]),
+              CoulombVariableValue(external_torques, speed, capacity, brake_torque, 0.1),
+              ODE(torques, speed, [1], [0.01, 1]),
+              WeightedSum([input_torque, resistant_torque, brake_torque], torques, [1, 1, 1])]
+    return bms.DynamicSystem(100, 400, blocks)
+
+
+def SaturatedLoop():
+    u = Sinus('u', 1., 3.)
+    e, s, w, y = [bms.Variable(name) for name in 'eswy']
+    blocks = [WeightedSum([u, y], e, [1., -1.]), Gain(e, s, 2.),
+              Saturation(s, w, -0.5, 0.5), ODE(w, y, [1], [1, 0.3])]
+    return bms.DynamicSystem(10, 1000, blocks)
+
+
+def ProductLoop():
+    u = Sinus('u', 0.5, 2., 0., 1.)
+    e, p, y = [bms.Variable(name) for name in 'epy']
+    blocks = [WeightedSum([u, p], e, [1., -0.3]), Product(e, e, p),
+              ODE(e, y, [1], [1, 1])]
+    return bms.DynamicSystem(10, 2000, blocks)
+
+
+for name, Model, smooth in [('brake', Brake, False), ('saturated loop', SaturatedLoop, True),
+                            ('product loop', ProductLoop, True)]:
+    results = {}
+    for loop_solver in ['newton', 'fsolve']:
+        ds = Model()
+        if loop_solver == 'newton':
+            ds.Simulate(loop_solver=loop_solver)
+        else:
+            # Reference on the step-by-step path
+            ds.Simulate(loop_solver=loop_solver, linear_fast_path=False,
+                        vectorize_feed_forward=False)
+        loop, = ds.algebraic_loops
+        results[loop_solver] = (ds.values.copy(), loop.residual_norms.max(),
+                                (~loop.converged).sum(), loop.function_evaluations.sum())
+    (values, residual, unconverged, evaluations), fsolve_results = results['newton'], results['fsolve']
+    print('{}: largest residual {:.3g} (fsolve {:.3g}), unconverged steps {} (fsolve {}), '
+          'evaluations {} (fsolve {})'.format(name, residual, fsolve_results[1], unconverged,
+                                              fsolve_results[2], evaluations, fsolve_results[3]))
+    assert residual <= 1.01*fsolve_results[1]+1e-8
+    assert unconverged <= fsolve_results[2]
+    if smooth:
+        assert unconverged == 0
+        assert np.max(np.abs(values-fsolve_results[0])) < 1e-7
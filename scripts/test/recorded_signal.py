@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+RecordedSignal read from .npy and raw binary files, compared with the
+interpolation of the whole trace by a SignalFunction, in simulations on the
+step-by-step path, by chunks and after saving and loading the model
+"""
+
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import bms
+from bms.signals.functions import SignalFunction
+from bms.signals.recorded import RecordedSignal
+from bms.blocks.continuous import Gain, ODE
+
+TE = 20.
+NS = 4000
+
+
+def Model(signal):
+    x = bms.Variable('x')
+    y = bms.Variable('y')
+    return bms.DynamicSystem(TE, NS, [Gain(signal, x, 2.), ODE(x, y, [1], [1, 0.5])])
+
+
+def Values(ds):
+    return np.array([variable.values for variable in ds.signals+ds.variables])
+
+
+random = np.random.RandomState(0)
+with tempfile.TemporaryDirectory() as directory:
+    # Regular samples from 0.5s, held before and after them
+    npy_file = os.path.join(directory, 'regular.npy')
+    samples = random.normal(size=1000)
+    np.save(npy_file, samples)
+    sample_times = 0.5+0.013*np.arange(len(samples))
+    # Irregular samples of times and values in float32 records
+    raw_file = os.path.join(directory, 'irregular.bin')
+    times = np.cumsum(random.uniform(0.001, 0.05, 2000)).astype(np.float32)
+    records = np.column_stack([random.normal(size=len(times)), times]).astype(np.float32)
+    records.tofile(raw_file)
+
+    cases = [('npy', RecordedSignal('u', npy_file, sample_time=0.013, start_time=0.5),
+              sample_times, samples),
+             ('raw', RecordedSignal('u', raw_file, value_column=0, time_column=1,
+                                    dtype='float32', columns=2),
+              records[:, 1].astype(float), records[:, 0].astype(float))]
+    for name, signal, signal_times, signal_values in cases:
+        reference_ds = Model(SignalFunction(
+            'u', lambda t: np.interp(t, signal_times, signal_values), vectorized=True))
+        reference_ds.Simulate(linear_fast_path=False, vectorize_feed_forward=False)
+        reference = Values(reference_ds)
+
+        ds = Model(signal)
+        ds.Simulate()
+        error = np.max(np.abs(Values(ds)-reference))
+        print('{}: error {:.3g}'.format(name, error))
+        assert error < 1e-9
+
+        # Signal evaluated chunk by chunk
+        chunks = [values for t, values in ds.SimulateChunks(ds.signals+ds.variables, 300)]
+        values = np.array([np.concatenate([chunk[i] for chunk in chunks]) for i in range(3)])
+        error = np.max(np.abs(values-reference))
+        print('{} by chunks: error {:.3g}'.format(name, error))
+        assert error < 1e-9
+
+        # Memory map opened again after loading
+        ds = pickle.loads(pickle.dumps(ds))
+        assert ds.signals[0]._data is None
+        ds.Simulate()
+        assert np.max(np.abs(Values(ds)-reference)) < 1e-9
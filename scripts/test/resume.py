@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Resumed, restarted and chunked simulations compared with single simulations
+on the step-by-step path: Resume extending or recomputing a simulation,
+restart from a checkpoint and SimulateChunks
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import bms
+from bms.signals.functions import SignalFunction
+from bms.blocks.continuous import Gain, ODE, WeightedSum
+from bms.blocks.nonlinear import Saturation
+
+STEP_BY_STEP = {'linear_fast_path': False, 'vectorize_feed_forward': False}
+
+
+def Model(te, amplitude):
+    """
+    Nonlinear loop (solved by Newton) driven by a sinus whose amplitude is a
+    function of time
+    """
+    u = SignalFunction('u', lambda t: amplitude(t)*np.sin(3*t))
+    e, s, w, y = [bms.Variable(name) for name in 'eswy']
+    blocks = [WeightedSum([u, y], e, [1., -1.]), Gain(e, s, 2.),
+              Saturation(s, w, -0.5, 0.5), ODE(w, y, [1], [1, 0.3])]
+    return bms.DynamicSystem(te, int(round(100*te)), blocks)
+
+
+def Compare(name, values, reference, tolerance=1e-9):
+    error = np.max(np.abs(values-reference))
+    print('{}: error {:.3g}'.format(name, error))
+    assert error <= tolerance
+
+
+def One(t):
+    return 1.
+
+
+def Switch(t):
+    # Amplitude changed at 12s, from the step recomputed by Resume
+    return 1. if t < 11.995 else 2.
+
+
+reference_ds = Model(20., One)
+reference_ds.Simulate(**STEP_BY_STEP)
+reference = reference_ds.values.copy()
+
+# Extension of a simulation to 20s
+for options in [{}, STEP_BY_STEP]:
+    single_ds = Model(20., One)
+    single_ds.Simulate(options=bms.SimulationOptions(**options))
+    ds = Model(10., One)
+    ds.Simulate(**options)
+    ds.Resume(te=20.)
+    assert ds.simulation_options.linear_fast_path == options.get('linear_fast_path', True)
+    assert np.array_equal(ds.values, single_ds.values), 'Resume differs from a single simulation'
+    Compare('resume to 20s {}'.format(options), ds.values, reference)
+
+# Recomputation from 12s with a new amplitude
+switch_ds = Model(20., Switch)
+switch_ds.Simulate(**STEP_BY_STEP)
+amplitudes = {'value': 1.}
+ds = Model(20., lambda t: amplitudes['value'])
+ds.Simulate()
+amplitudes['value'] = 2.
+ds.Resume(t_start=12.)
+Compare('resume from 12s with a new input', ds.values, switch_ds.values)
+
+# Restart from the last checkpoint
+with tempfile.TemporaryDirectory() as directory:
+    checkpoint_file = os.path.join(directory, 'checkpoint.npz')
+    ds = Model(20., One)
+    ds.Simulate(checkpoint_file=checkpoint_file, checkpoint_interval=700)
+    complete = ds.values.copy()
+    ds = Model(20., One)
+    ds.Simulate(checkpoint_file=checkpoint_file, checkpoint_interval=700, restart=True)
+    known = ~np.isnan(ds.values)
+    assert 0 < known[0].sum() < known.shape[1], 'Simulation not restarted from the checkpoint'
+    assert np.array_equal(ds.values[known], complete[known]), 'Restart differs from the simulation'
+    Compare('restart from a checkpoint', ds.values[known], reference[known])
+
+# Chunks of steps
+ds = Model(20., One)
+variables = {variable.name: variable for variable in ds.variables}
+recorded = [variables['y'], variables['e']]
+for chunk_size, storage_dtype, tolerance in [(128, 'float64', 1e-9), (500, 'float32', 1e-6)]:
+    times = []
+    chunks = []
+    for t, values in ds.SimulateChunks(recorded, chunk_size, storage_dtype=storage_dtype):
+        times.append(t)
+        chunks.append(values)
+        assert all(value.dtype == np.dtype(storage_dtype) for value in values)
+    assert np.allclose(np.concatenate(times), reference_ds.t)
+    Compare('chunks of {} steps in {}'.format(chunk_size, storage_dtype),
+            np.array([np.concatenate([values[i] for values in chunks]) for i in range(2)]),
+            reference[[ds.variables.index(variable) for variable in recorded]], tolerance)
+    assert ds.algebraic_loops[0].converged.shape == (ds.ns+1,)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Values stored in other dtypes, decimated or restricted to some variables,
+compared with a simulation keeping all values in float64 on the
+step-by-step path. Simulations are longer than the buffer of steps used for
+such storages
+"""
+
+import numpy as np
+import bms
+from bms.signals.functions import Sinus
+from bms.blocks.continuous import Gain, ODE, WeightedSum
+from bms.blocks.nonlinear import Saturation
+
+STEP_BY_STEP = {'linear_fast_path': False, 'vectorize_feed_forward': False}
+
+
+def Model():
+    """
+    Nonlinear loop followed by a second order filter, whose output is stored
+    in float32
+    """
+    u = Sinus('u', 1., 3.)
+    e, s, w, y = [bms.Variable(name) for name in 'eswy']
+    z = bms.Variable('z', storage_dtype='float32')
+    blocks = [WeightedSum([u, y], e, [1., -1.]), Gain(e, s, 2.),
+              Saturation(s, w, -0.5, 0.5), ODE(w, y, [1], [1, 0.3]),
+              ODE(y, z, [1], [1, 0.2, 0.05])]
+    return bms.DynamicSystem(120, 12000, blocks)
+
+
+def Variables(ds):
+    return {variable.name: variable for variable in ds.variables+ds.signals}
+
+
+reference_ds = Model()
+reference_ds.Simulate(storage_dtype='float64', **STEP_BY_STEP)
+reference = Variables(reference_ds)
+# Variables with their own storage dtype are stored in it
+assert reference['z'].values.dtype == np.float32
+assert reference['y'].values.dtype == np.float64
+
+
+def Check(name, ds, variable, decimation, dtype, tolerance):
+    values = Variables(ds)[variable].values
+    reference_values = reference[variable].values[::decimation]
+    assert values.dtype == np.dtype(dtype), '{}: {} stored in {}'.format(name, variable, values.dtype)
+    assert values.shape == reference_values.shape
+    assert np.array_equal(ds.VariableTimes(Variables(ds)[variable]), reference_ds.t[::decimation])
+    error = np.max(np.abs(values-reference_values))
+    print('{}, {}: error {:.3g}'.format(name, variable, error))
+    assert error <= tolerance
+
+
+for options in [{}, STEP_BY_STEP]:
+    ds = Model()
+    ds.Simulate(storage_dtype='float32', **options)
+    for variable in 'eswyz':
+        Check('float32 {}'.format(options), ds, variable, 1, 'float32', 1e-6)
+    assert ds.values.dtype == np.float32
+
+    ds = Model()
+    ds.Simulate(decimation=7, **options)
+    for variable in 'eswy':
+        Check('decimation 7 {}'.format(options), ds, variable, 7, 'float64', 1e-9)
+    assert ds.values.shape == (len(ds.variables), len(reference_ds.t[::7]))
+
+    ds = Model()
+    variables = Variables(ds)
+    ds.Simulate(variables_to_record={variables['y']: 1, variables['e']: 10, variables['u']: 3},
+                **options)
+    Check('recorded {}'.format(options), ds, 'y', 1, 'float64', 1e-9)
+    Check('recorded {}'.format(options), ds, 'e', 10, 'float64', 1e-9)
+    Check('recorded {}'.format(options), ds, 'u', 3, 'float64', 0.)
+    assert len(variables['s'].values) == 0 and len(ds.VariableTimes(variables['s'])) == 0
+    # Variables recorded with different decimations
+    assert ds.values is None
+    # Blocks read the recorded values after the simulation
+    ode = ds.blocks[3]
+    it = 1234+ds.max_order
+    assert ode.inputs[0] is variables['w'] and ode.outputs[0] is variables['y']
+    assert ode.OutputValues(it)[0, -1] == variables['y']._values[it-1]
+
+# Recorded variables of the whole simulation, in float64
+ds = Model()
+ds.Simulate(variables_to_record=Variables(ds).values(), **STEP_BY_STEP)
+assert np.array_equal(ds.values, reference_ds.values)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweep in a pool of processes, from a model factory and from a
+saved model, compared with simulations of each parameter set on the
+step-by-step path
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import bms
+from bms.sweep import Sweep
+from bms.signals.functions import Step
+from bms.blocks.continuous import Gain, ODE, WeightedSum
+from bms.blocks.nonlinear import Saturation
+
+
+def Model():
+    u = Step('u', 1.)
+    e, s, w, y = [bms.Variable(name) for name in 'eswy']
+    blocks = [WeightedSum([u, y], e, [1., -1.]), Gain(e, s, 2.),
+              Saturation(s, w, -0.5, 0.5), ODE(w, y, [1], [1, 0.3])]
+    return bms.DynamicSystem(5, 500, blocks)
+
+
+def SetParameters(model, gain, time_constant):
+    model.blocks[1].value = gain
+    model.blocks[3].b = [1, time_constant]
+
+
+if __name__ == '__main__':
+    parameters = {'gain': [0.5, 2., 5.], 'time_constant': [0.1, 1.]}
+    references = []
+    for gain in parameters['gain']:
+        for time_constant in parameters['time_constant']:
+            ds = Model()
+            SetParameters(ds, gain, time_constant)
+            ds.Simulate(linear_fast_path=False, vectorize_feed_forward=False)
+            references.append({variable.name: variable.values.copy()
+                               for variable in ds.variables})
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_file = os.path.join(directory, 'model')
+        Model().Save(model_file)
+        for model in [Model, model_file+'.bms']:
+            results = list(Sweep(model, parameters, SetParameters, ['y', 'e'], max_workers=2))
+            assert len(results) == len(references)
+            for (parameter_set, values), reference in zip(results, references):
+                assert sorted(values) == ['e', 'y']
+                error = max(np.max(np.abs(values[name]-reference[name])) for name in values)
+                print('{} {}: error {:.3g}'.format(getattr(model, '__name__', 'saved model'),
+                                                    parameter_set, error))
+                assert error < 1e-9